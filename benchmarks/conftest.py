@@ -0,0 +1,146 @@
+"""Timing harness for the benchmark suite, comparing against and optionally updating JSON baselines"""
+
+import gc
+import inspect
+import json
+import statistics
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+DEFAULT_BASELINE: Path = Path(__file__).parent / "baseline.json"
+DEFAULT_TOLERANCE: float = 1.0
+
+RESULTS_KEY: pytest.StashKey[dict[str, "BenchmarkResult"]] = pytest.StashKey()
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    group = parser.getgroup("autoarm benchmarks")
+    group.addoption("--benchmark-baseline", type=Path, default=DEFAULT_BASELINE, help="JSON baseline to compare against")
+    group.addoption("--benchmark-update", action="store_true", help="Write measured timings to the baseline")
+    group.addoption(
+        "--benchmark-tolerance",
+        type=float,
+        default=DEFAULT_TOLERANCE,
+        help="Allowed slowdown of the fastest round over the baseline, as a fraction",
+    )
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    config.stash[RESULTS_KEY] = {}
+
+
+def pytest_sessionfinish(session: pytest.Session, exitstatus: int) -> None:
+    config: pytest.Config = session.config
+    results: dict[str, BenchmarkResult] = config.stash.get(RESULTS_KEY, {})
+    if not results or not config.getoption("--benchmark-update"):
+        return
+    path: Path = config.getoption("--benchmark-baseline")
+    baseline: dict[str, Any] = load_baseline(path)
+    baseline.update({name: result.as_dict() for name, result in sorted(results.items())})
+    path.write_text(json.dumps(dict(sorted(baseline.items())), indent=2) + "\n")
+
+
+def pytest_terminal_summary(terminalreporter: Any, config: pytest.Config) -> None:
+    results: dict[str, BenchmarkResult] = config.stash.get(RESULTS_KEY, {})
+    if not results:
+        return
+    terminalreporter.section("autoarm benchmarks")
+    terminalreporter.write_line(f"{'name':<40} {'rounds':>7} {'min us':>10} {'median us':>10} {'p95 us':>10}")
+    for name, result in sorted(results.items()):
+        terminalreporter.write_line(
+            f"{name:<40} {result.rounds:>7} {result.min_us:>10.1f} {result.median_us:>10.1f} {result.p95_us:>10.1f}"
+        )
+
+
+def load_baseline(path: Path) -> dict[str, Any]:
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text())
+
+
+@dataclass
+class BenchmarkResult:
+    """Timings for one benchmark, in microseconds"""
+
+    rounds: int
+    min_us: float
+    median_us: float
+    mean_us: float
+    p95_us: float
+
+    @classmethod
+    def from_timings(cls, timings: list[float]) -> "BenchmarkResult":
+        micros: list[float] = sorted(t * 1_000_000 for t in timings)
+        return cls(
+            rounds=len(micros),
+            min_us=round(micros[0], 2),
+            median_us=round(statistics.median(micros), 2),
+            mean_us=round(statistics.fmean(micros), 2),
+            p95_us=round(micros[min(len(micros) - 1, int(len(micros) * 0.95))], 2),
+        )
+
+    def as_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+class Benchmark:
+    """Time a sync or async callable over a number of rounds, after warming up
+
+    The fastest round, being the least disturbed by scheduling noise, is checked against the baseline,
+    so a regression fails the benchmark
+    """
+
+    def __init__(self, name: str, config: pytest.Config) -> None:
+        self.name: str = name
+        self.config: pytest.Config = config
+        self.result: BenchmarkResult | None = None
+
+    async def __call__(
+        self, func: Callable[..., Awaitable[Any] | Any], *args: Any, rounds: int = 100, warmup: int = 5, **kwargs: Any
+    ) -> BenchmarkResult:
+        for _ in range(warmup):
+            await self.run_once(func, *args, **kwargs)
+        timings: list[float] = []
+        # as with timeit, keep garbage collection pauses out of the timings
+        gc.collect()
+        gc.disable()
+        try:
+            for _ in range(rounds):
+                started: float = time.perf_counter()
+                await self.run_once(func, *args, **kwargs)
+                timings.append(time.perf_counter() - started)
+        finally:
+            gc.enable()
+        self.result = BenchmarkResult.from_timings(timings)
+        self.config.stash[RESULTS_KEY][self.name] = self.result
+        self.check_baseline(self.result)
+        return self.result
+
+    async def run_once(self, func: Callable[..., Awaitable[Any] | Any], *args: Any, **kwargs: Any) -> Any:
+        outcome: Any = func(*args, **kwargs)
+        if inspect.isawaitable(outcome):
+            outcome = await outcome
+        return outcome
+
+    def check_baseline(self, result: BenchmarkResult) -> None:
+        if self.config.getoption("--benchmark-update"):
+            return
+        baseline: dict[str, Any] = load_baseline(self.config.getoption("--benchmark-baseline")).get(self.name, {})
+        if "min_us" not in baseline:
+            return
+        limit: float = baseline["min_us"] * (1 + self.config.getoption("--benchmark-tolerance"))
+        if result.min_us > limit:
+            pytest.fail(
+                f"{self.name} min {result.min_us:.1f}us exceeds baseline {baseline['min_us']:.1f}us "
+                f"by more than the {self.config.getoption('--benchmark-tolerance'):.0%} tolerance"
+            )
+
+
+@pytest.fixture
+def benchmark(request: pytest.FixtureRequest) -> Benchmark:
+    return Benchmark(request.node.name, request.config)
@@ -0,0 +1,172 @@
+import datetime as dt
+import itertools
+from collections.abc import AsyncGenerator
+
+import homeassistant.util.dt as dt_util
+import pytest
+from homeassistant.components.alarm_control_panel.const import AlarmControlPanelState
+from homeassistant.components.local_calendar import CONF_CALENDAR_NAME, LocalCalendarStore  # type: ignore[attr-defined]
+from homeassistant.components.local_calendar.const import DOMAIN as LOCAL_CALENDAR_DOMAIN  # type: ignore[import-not-found]
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.const import CONF_ENTITY_ID, Platform
+from homeassistant.core import HomeAssistant, ServiceCall, callback
+from homeassistant.helpers.entity_platform import EntityPlatform
+from homeassistant.setup import async_setup_component
+from ical.calendar import Calendar
+from ical.calendar_stream import IcsCalendarStream
+from ical.event import Event
+from pytest_homeassistant_custom_component.common import AsyncMock, MockConfigEntry
+
+from benchmarks.conftest import Benchmark
+from conftest import TEST_PANEL
+from custom_components.autoarm.autoarming import AlarmArmer
+from custom_components.autoarm.calendar_events import TrackedCalendar
+from custom_components.autoarm.const import (
+    CONF_CALENDAR_EVENT_STATES,
+    CONF_CALENDAR_POLL_INTERVAL,
+    NO_CAL_EVENT_MODE_AUTO,
+    ChangeSource,
+)
+from custom_components.autoarm.helpers import AppHealthTracker, Limiter
+from custom_components.autoarm.notifier import Notifier
+
+CALENDAR_EVENT_COUNT = 2000
+
+
+@pytest.fixture
+async def settled_armer(hass: HomeAssistant, autoarmer: AlarmArmer) -> AlarmArmer:
+    hass.states.async_set("sun.sun", "above_horizon")
+    hass.states.async_set("person.tester_bob", "home")
+    hass.states.async_set(TEST_PANEL, "armed_home")
+    await hass.async_block_till_done()
+    return autoarmer
+
+
+@pytest.fixture
+async def busy_calendar(
+    hass: HomeAssistant, calendar_platform: EntityPlatform, mock_armer_real_hass: AlarmArmer
+) -> AsyncGenerator[TrackedCalendar]:
+    now: dt.datetime = dt_util.now()
+    # loaded through the calendar store as one ics file, since each create_event call rewrites the whole calendar
+    calendar = Calendar()
+    calendar.events.extend(
+        Event(
+            dtstart=now - dt.timedelta(minutes=10) + dt.timedelta(seconds=i % 600),
+            dtend=now + dt.timedelta(hours=1),
+            summary=f"Holidays {i}" if i % 10 == 0 else f"Dentist {i}",
+        )
+        for i in range(CALENDAR_EVENT_COUNT)
+    )
+    await async_setup_component(hass=hass, domain=LOCAL_CALENDAR_DOMAIN, config={})
+    config_entry = MockConfigEntry(
+        domain=LOCAL_CALENDAR_DOMAIN, title="busy", state=ConfigEntryState.LOADED, data={CONF_CALENDAR_NAME: "busy"}
+    )
+    config_entry.runtime_data = AsyncMock(spec=LocalCalendarStore)
+    config_entry.runtime_data.async_load.return_value = IcsCalendarStream.calendar_to_ics(calendar)
+    config_entry.add_to_hass(hass)
+    await hass.config_entries.async_forward_entry_setups(config_entry, [Platform.CALENDAR])
+    await hass.async_block_till_done()
+
+    tracked = TrackedCalendar(
+        mock_armer_real_hass.hass,
+        {
+            CONF_ENTITY_ID: "calendar.busy",
+            CONF_CALENDAR_POLL_INTERVAL: 10,
+            CONF_CALENDAR_EVENT_STATES: {"armed_away": ["Away"], "armed_vacation": ["Holiday.*"]},
+        },
+        no_event_mode=NO_CAL_EVENT_MODE_AUTO,
+        armer=mock_armer_real_hass,
+        app_health_tracker=mock_armer_real_hass.app_health_tracker,
+    )
+    await tracked.initialize(calendar_platform)
+    yield tracked
+    tracked.shutdown()
+
+
+async def test_reset_armed_state(benchmark: Benchmark, settled_armer: AlarmArmer) -> None:
+    await benchmark(settled_armer.reset_armed_state, source=ChangeSource.OCCUPANCY, rounds=500)
+    assert settled_armer.armed_state() == AlarmControlPanelState.ARMED_HOME
+
+
+async def test_determine_state(benchmark: Benchmark, settled_armer: AlarmArmer) -> None:
+    await benchmark(settled_armer.determine_state, rounds=2000)
+    assert settled_armer.determine_state() == AlarmControlPanelState.ARMED_HOME
+
+
+async def test_match_events(benchmark: Benchmark, busy_calendar: TrackedCalendar) -> None:
+    await benchmark(busy_calendar.match_events, rounds=10, warmup=1)
+    assert len(busy_calendar.tracked_events) == CALENDAR_EVENT_COUNT // 10
+
+
+async def test_match_event(benchmark: Benchmark, busy_calendar: TrackedCalendar) -> None:
+    texts: list[tuple[str, str | None]] = [
+        (f"Dentist {i}", "Remember to bring the forms and arrive ten minutes early") for i in range(90)
+    ] + [(f"Holidays {i}", None) for i in range(10)]
+
+    def match_all() -> None:
+        for summary, description in texts:
+            busy_calendar.match_event(summary, description)
+
+    await benchmark(match_all, rounds=200)
+    assert busy_calendar.match_event("Holidays 1", None) == "armed_vacation"
+
+
+async def test_notify_routing(benchmark: Benchmark, hass: HomeAssistant) -> None:
+    calls: list[ServiceCall] = []
+
+    @callback
+    def handler(call: ServiceCall) -> None:
+        calls.append(call)
+
+    hass.services.async_register("notify", "test_service", handler)
+    notifier = Notifier(
+        {
+            "quiet": {"source": [ChangeSource.SUNRISE, ChangeSource.SUNSET]},
+            "night": {"state": ["armed_night"]},
+            "backstop": {},
+        },
+        hass,
+        AppHealthTracker(hass),
+        "notify.test_service",
+    )
+    changes = itertools.cycle(
+        itertools.product(
+            ChangeSource,
+            (AlarmControlPanelState.DISARMED, AlarmControlPanelState.ARMED_HOME),
+            (AlarmControlPanelState.ARMED_AWAY, AlarmControlPanelState.ARMED_NIGHT),
+        )
+    )
+
+    async def notify() -> None:
+        source, from_state, to_state = next(changes)
+        await notifier.notify(source, from_state, to_state)
+
+    await benchmark(notify, rounds=1000)
+    await hass.async_block_till_done()
+    assert len(calls) == 1005
+    notifier.shutdown()
+
+
+async def test_limiter_allowing(benchmark: Benchmark) -> None:
+    limiter = Limiter(dt.timedelta(hours=1), max_calls=1_000_000, max_calls_per_source=1_000_000)
+    sources = itertools.cycle(ChangeSource)
+
+    def burst() -> None:
+        for _ in range(1000):
+            limiter.triggered(next(sources))
+
+    await benchmark(burst, rounds=20)
+    assert limiter.remaining() == 1_000_000 - 25_000
+
+
+async def test_limiter_rejecting(benchmark: Benchmark) -> None:
+    limiter = Limiter(dt.timedelta(hours=1), max_calls=100)
+    for _ in range(100):
+        limiter.triggered()
+
+    def burst() -> None:
+        for _ in range(1000):
+            limiter.triggered(ChangeSource.OCCUPANCY)
+
+    await benchmark(burst, rounds=20)
+    assert limiter.remaining() == 0
@@ -1,3 +1,4 @@
+import asyncio
 from collections.abc import AsyncGenerator, Generator
 from typing import TYPE_CHECKING, Any
 from unittest.mock import Mock, patch
@@ -10,8 +11,8 @@ from homeassistant.components.local_calendar.const import DOMAIN as LOCAL_CALEND
 from homeassistant.components.notify.legacy import BaseNotificationService
 from homeassistant.config_entries import ConfigEntryState
 from homeassistant.const import CONF_NAME, Platform
-from homeassistant.core import HomeAssistant, SupportsResponse, callback
-from homeassistant.exceptions import DependencyError
+from homeassistant.core import HomeAssistant, ServiceCall, SupportsResponse, callback
+from homeassistant.exceptions import DependencyError, HomeAssistantError
 from homeassistant.helpers import entity_platform
 from homeassistant.setup import async_setup_component
 from homeassistant.util import slugify
@@ -145,13 +146,16 @@ def night(hass: HomeAssistant) -> None:
 
 
 @pytest.fixture
-def occupied(hass: HomeAssistant) -> None:
+async def occupied(hass: HomeAssistant) -> None:
     hass.states.async_set("person.tester_bob", "home")
+    # occupancy is indexed from state change events, which are only dispatched once the loop runs
+    await hass.async_block_till_done()
 
 
 @pytest.fixture
-def unoccupied(hass: HomeAssistant) -> None:
+async def unoccupied(hass: HomeAssistant) -> None:
     hass.states.async_set("person.tester_bob", "away")
+    await hass.async_block_till_done()
 
 
 class MockAction(BaseNotificationService):
@@ -181,6 +185,38 @@ def mock_notify(hass: HomeAssistant) -> MockAction:
     return mock_action
 
 
+class NotifyRecorder:
+    """Records calls to notify actions, failing or stalling calls for chosen actions or targets."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self.hass: HomeAssistant = hass
+        self.calls: list[ServiceCall] = []
+        self.failing: set[str] = set()
+        self.stalling: set[str] = set()
+        self.stall_seconds: float = 0.5
+
+    def register(self, *actions: str) -> None:
+        for action in actions:
+            self.hass.services.async_register("notify", action, self.handle)
+
+    async def handle(self, call: ServiceCall) -> None:
+        names: set[str] = {call.service, *call.data.get("target", [])}
+        if names & self.stalling:
+            await asyncio.sleep(self.stall_seconds)
+        if names & self.failing:
+            raise HomeAssistantError(f"{call.service} failed")
+        self.calls.append(call)
+
+    @property
+    def data(self) -> list[dict[str, Any]]:
+        return [dict(call.data) for call in self.calls]
+
+
+@pytest.fixture
+def notify_recorder(hass: HomeAssistant) -> NotifyRecorder:
+    return NotifyRecorder(hass)
+
+
 @pytest.fixture
 async def setup_autoarm(
     hass: HomeAssistant,
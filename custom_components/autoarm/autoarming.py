@@ -1,9 +1,11 @@
 import asyncio
+import bisect
 import datetime as dt
 import json
 import logging
 import re
-from collections.abc import Callable, Coroutine
+from collections import deque
+from collections.abc import Callable, Coroutine, Iterator
 from dataclasses import dataclass
 from functools import partial
 from typing import TYPE_CHECKING, Any, cast
@@ -21,7 +23,6 @@ from homeassistant.const import (
     CONF_SERVICE,
     EVENT_HOMEASSISTANT_STOP,
     SERVICE_RELOAD,
-    STATE_HOME,
 )
 from homeassistant.core import (
     Event,
@@ -38,7 +39,7 @@ from homeassistant.helpers import config_validation as cv
 from homeassistant.helpers import entity_platform
 from homeassistant.helpers import issue_registry as ir
 from homeassistant.helpers.event import (
-    async_track_point_in_time,
+    async_call_later,
     async_track_state_change_event,
     async_track_sunrise,
     async_track_sunset,
@@ -48,10 +49,11 @@ from homeassistant.helpers.reload import (
     async_integration_yaml_config,
 )
 from homeassistant.helpers.service import async_register_admin_service
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.typing import ConfigType
 from homeassistant.util.hass_dict import HassKey
 
-from custom_components.autoarm.hass_api import HomeAssistantAPI
+from custom_components.autoarm.hass_api import CompiledCondition, HomeAssistantAPI
 from custom_components.autoarm.notifier import Notifier
 
 from .calendar_events import TrackedCalendar, TrackedCalendarEvent
@@ -74,13 +76,16 @@ from .config_flow import (
 )
 from .const import (
     ATTR_RESET,
+    CALENDAR_TRACKING_POLL,
     CONF_ALARM_PANEL,
     CONF_BUTTONS,
     CONF_CALENDAR_CONTROL,
     CONF_CALENDAR_EVENT_STATES,
     CONF_CALENDAR_NO_EVENT,
     CONF_CALENDAR_POLL_INTERVAL,
+    CONF_CALENDAR_TRACKING,
     CONF_CALENDARS,
+    CONF_COALESCE_WINDOW,
     CONF_DAY,
     CONF_DIURNAL,
     CONF_EARLIEST,
@@ -91,7 +96,10 @@ from .const import (
     CONF_OCCUPANCY_DEFAULT,
     CONF_RATE_LIMIT,
     CONF_RATE_LIMIT_CALLS,
+    CONF_RATE_LIMIT_CALLS_PER_SOURCE,
+    CONF_RATE_LIMIT_ENTITIES,
     CONF_RATE_LIMIT_PERIOD,
+    CONF_RATE_LIMIT_SOURCES,
     CONF_SUNRISE,
     CONF_SUNSET,
     CONF_TRANSITIONS,
@@ -109,11 +117,15 @@ from .helpers import (
     AppHealthTracker,
     ExtendedExtendedJSONEncoder,
     Limiter,
+    LimiterRegistry,
+    OccupancyIndex,
+    ScheduledJobs,
     alarm_state_as_enum,
     change_source_as_enum,
     deobjectify,
     safe_state,
 )
+from .transitions import TransitionTable, native_condition
 
 if TYPE_CHECKING:
     from collections.abc import Mapping
@@ -134,6 +146,18 @@ NS_MOBILE_ACTIONS = "mobile_actions"
 PLATFORMS = ["autoarm"]
 
 HASS_DATA_KEY: HassKey["AutoArmData"] = HassKey(DOMAIN)
+# one store instance is shared across reloads, so a pending delayed write is seen by the next load
+STORE_DATA_KEY: HassKey[Store[dict[str, Any]]] = HassKey(f"{DOMAIN}_store")
+STORAGE_VERSION = 1
+STORAGE_KEY = f"{DOMAIN}.state"
+STORE_SAVE_DELAY = 10
+
+
+def reset_job_id(source: ChangeSource | None) -> str:
+    return f"reset_{source}"
+
+
+OCCUPANCY_RESET_JOB = reset_job_id(ChangeSource.OCCUPANCY)
 
 
 @dataclass
@@ -224,6 +248,7 @@ async def async_setup(
                 "enabled": entry.options.get(CONF_NOTIFY_ENABLED, True),
             },
             CONF_RATE_LIMIT: stashed_yaml.get(CONF_RATE_LIMIT, {}),
+            CONF_COALESCE_WINDOW: stashed_yaml.get(CONF_COALESCE_WINDOW),
         }
         try:
             jsonized: str = json.dumps(obj=data, cls=ExtendedExtendedJSONEncoder)
@@ -302,6 +327,7 @@ def _build_armer_from_entry(hass: HomeAssistant, entry: ConfigEntry, yaml_config
         cal_config: ConfigType = {
             CONF_ENTITY_ID: cal_entity_id,
             CONF_CALENDAR_POLL_INTERVAL: yaml_override.get(CONF_CALENDAR_POLL_INTERVAL, 15),
+            CONF_CALENDAR_TRACKING: yaml_override.get(CONF_CALENDAR_TRACKING, CALENDAR_TRACKING_POLL),
             CONF_CALENDAR_EVENT_STATES: yaml_override.get(CONF_CALENDAR_EVENT_STATES, _validated_default_calendar_mappings()),
         }
         calendar_list.append(cal_config)
@@ -341,6 +367,7 @@ def _build_armer_from_entry(hass: HomeAssistant, entry: ConfigEntry, yaml_config
         notify_action=entry.options.get(CONF_NOTIFY_ACTION),
         notify_targets=entry.options.get(CONF_NOTIFY_TARGETS, []),
         rate_limit=yaml_config.get(CONF_RATE_LIMIT, {}),
+        coalesce_window=yaml_config.get(CONF_COALESCE_WINDOW),
         calendar_config=calendar_config,
         transitions=yaml_config.get(CONF_TRANSITIONS),
         calendar_occupancy_override_states=entry.options.get(
@@ -404,6 +431,94 @@ class Intervention:
             "state": str(self.state) if self.state is not None else None,
         }
 
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "Intervention | None":
+        created_at: dt.datetime | None = dt_util.parse_datetime(data.get("created_at") or "")
+        if created_at is None:
+            return None
+        source: ChangeSource | None = change_source_as_enum(data.get("source"))
+        if source is None:
+            return None
+        return cls(created_at, source, alarm_state_as_enum(data.get("state")))
+
+
+class InterventionStore:
+    """Manual interventions in time order, evicted once older than the TTL
+
+    The latest intervention that set a state is tracked directly, since every newer one replaces it,
+    and it can only be evicted once no state setting intervention remains
+    """
+
+    def __init__(self, ttl: dt.timedelta) -> None:
+        self.ttl: dt.timedelta = ttl
+        self.entries: deque[Intervention] = deque()
+        self.latest_state: Intervention | None = None
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __iter__(self) -> Iterator[Intervention]:
+        return iter(self.entries)
+
+    def add(self, intervention: Intervention) -> None:
+        """Record an intervention, evicting any expired as of its creation"""
+        # normally appends, insort only moves an entry if the clock stepped backwards
+        bisect.insort_right(self.entries, intervention, key=lambda i: i.created_at)
+        if intervention.state is not None and (
+            self.latest_state is None or intervention.created_at >= self.latest_state.created_at
+        ):
+            self.latest_state = intervention
+        self.evict(intervention.created_at)
+
+    def evict(self, now: dt.datetime) -> None:
+        while self.entries and now >= self.entries[0].created_at + self.ttl:
+            if self.entries.popleft() is self.latest_state:
+                self.latest_state = None
+
+    def has_since(self, cutoff: dt.datetime) -> bool:
+        return bool(self.entries) and self.entries[-1].created_at > cutoff
+
+    def clear(self) -> None:
+        self.entries.clear()
+        self.latest_state = None
+
+
+@dataclass(frozen=True)
+class StateSnapshot:
+    """Point in time view of the panel, occupancy, sun and calendar, captured once per decision"""
+
+    armed_state: AlarmControlPanelState
+    occupied: bool | None
+    unoccupied: bool | None
+    at_home: tuple[str, ...] | None
+    not_home: tuple[str, ...] | None
+    night: bool
+    active_calendar_event: TrackedCalendarEvent | None
+    captured_at: dt.datetime
+
+    def condition_variables(self, occupied_defaults: dict[str, AlarmControlPanelState]) -> ConditionVariables:
+        return ConditionVariables(
+            occupied=self.occupied,
+            unoccupied=self.unoccupied,
+            night=self.night,
+            state=self.armed_state,
+            calendar_event=self.active_calendar_event.event if self.active_calendar_event else None,
+            occupied_defaults=occupied_defaults,
+            at_home=list(self.at_home) if self.at_home is not None else None,
+            not_home=list(self.not_home) if self.not_home is not None else None,
+        )
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "armed_state": str(self.armed_state),
+            "occupied": self.occupied,
+            "at_home": list(self.at_home) if self.at_home is not None else None,
+            "not_home": list(self.not_home) if self.not_home is not None else None,
+            "night": self.night,
+            "active_calendar_event": self.active_calendar_event.id if self.active_calendar_event else None,
+            "captured_at": self.captured_at.isoformat(),
+        }
+
 
 @dataclass
 class AlarmStateWithAttributes:
@@ -429,6 +544,7 @@ class AlarmArmer:
         sunset_earliest: dt.time | None = None,
         sunset_latest: dt.time | None = None,
         rate_limit: ConfigType | None = None,
+        coalesce_window: dt.timedelta | None = None,
         calendar_config: ConfigType | None = None,
         transitions: dict[str, dict[str, list[ConfigType]]] | None = None,
         calendar_occupancy_override_states: list[str] | None = None,
@@ -463,6 +579,7 @@ class AlarmArmer:
         self.sunset_earliest: dt.time | None = sunset_earliest
         self.sunset_latest: dt.time | None = sunset_latest
         self.occupants: list[str] = occupancy.get(CONF_ENTITY_ID, [])
+        self.occupancy: OccupancyIndex = OccupancyIndex(self.occupants)
         self.occupied_defaults: dict[str, AlarmControlPanelState] = occupancy.get(
             CONF_OCCUPANCY_DEFAULT, {CONF_DAY: AlarmControlPanelState.ARMED_HOME}
         )
@@ -471,28 +588,53 @@ class AlarmArmer:
 
         self.actions: list[str] = actions or []
         self.unsubscribes: list[Callable[[], None]] = []
+        self.scheduled_jobs: ScheduledJobs = ScheduledJobs(hass)
         self.pre_pending_state: AlarmControlPanelState | None = None
         self.button_device: dict[str, str] = {}
-        self.arming_in_progress: asyncio.Event = asyncio.Event()
 
-        self.rate_limiter: Limiter = Limiter(
-            window=rate_limit.get(CONF_RATE_LIMIT_PERIOD, dt.timedelta(seconds=60)),
-            max_calls=rate_limit.get(CONF_RATE_LIMIT_CALLS, 5),
+        self.rate_limiter: LimiterRegistry = LimiterRegistry(
+            Limiter(
+                window=rate_limit.get(CONF_RATE_LIMIT_PERIOD, dt.timedelta(seconds=60)),
+                max_calls=rate_limit.get(CONF_RATE_LIMIT_CALLS, 5),
+                max_calls_per_source=rate_limit.get(CONF_RATE_LIMIT_CALLS_PER_SOURCE),
+            ),
+            sources={
+                source: Limiter(window=policy[CONF_RATE_LIMIT_PERIOD], max_calls=policy[CONF_RATE_LIMIT_CALLS])
+                for source, policy in rate_limit.get(CONF_RATE_LIMIT_SOURCES, {}).items()
+            },
+            entities={
+                entity_id: Limiter(window=policy[CONF_RATE_LIMIT_PERIOD], max_calls=policy[CONF_RATE_LIMIT_CALLS])
+                for entity_id, policy in rate_limit.get(CONF_RATE_LIMIT_ENTITIES, {}).items()
+            },
         )
 
+        self.coalesce_window: dt.timedelta = coalesce_window or dt.timedelta(0)
+        self.coalesced_sources: list[ChangeSource] = []
+        self.coalesced_entity_ids: list[str] = []
+        self.coalesce_unsub: Callable[[], None] | None = None
+
         self.hass_api: HomeAssistantAPI = HomeAssistantAPI(hass)
         self.transitions: dict[AlarmControlPanelState, ConditionCheckerType] = {}
+        self.transition_table: TransitionTable | None = None
         self.transition_config: dict[str, dict[str, list[ConfigType]]] = transitions or {}
 
-        self.interventions: list[Intervention] = []
-        self.intervention_ttl: int = 60
+        self.interventions: InterventionStore = InterventionStore(ttl=dt.timedelta(minutes=60))
+        self.store: Store[dict[str, Any]] = hass.data.setdefault(
+            STORE_DATA_KEY, Store[dict[str, Any]](hass, STORAGE_VERSION, STORAGE_KEY)
+        )
+        self.restored_calendar_states: dict[str, AlarmControlPanelState] = {}
+        self.save_pending: bool = False
 
     async def initialize(self) -> None:
         """Async initialization"""
+        # calendar and logic setup may consult occupancy before its listener is in place
+        self.occupancy.rebuild(self.hass)
         _LOGGER.info("AUTOARM occupied=%s, state=%s, calendars=%s", self.is_occupied(), self.armed_state(), len(self.calendars))
 
         self.initialize_alarm_panel()
+        await self.restore_state()
         await self.initialize_calendar()
+        self.restored_calendar_states = {}
         await self.initialize_logic()
         self.initialize_diurnal()
         self.initialize_occupancy()
@@ -575,6 +717,8 @@ class AlarmArmer:
         """Configure occupants, and listen for changes in their state"""
         if self.occupants:
             _LOGGER.info("AUTOARM Occupancy determined by %s", ",".join(self.occupants))
+            # catch up on any changes while awaiting calendar and logic setup
+            self.occupancy.rebuild(self.hass)
             self.unsubscribes.append(async_track_state_change_event(self.hass, self.occupants, self.on_occupancy_change))
         else:
             _LOGGER.info("AUTOARM Occupancy not configured")
@@ -603,6 +747,62 @@ class AlarmArmer:
                         button_use, entity_id, partial(self.on_alarm_state_button, AlarmControlPanelState(button_use), delay)
                     )
 
+    async def restore_state(self) -> None:
+        """Reload interventions and decision state saved before the last restart or reload"""
+        try:
+            data: dict[str, Any] | None = await self.store.async_load()
+        except Exception:
+            self.app_health_tracker.record_initialization_error("restore")
+            _LOGGER.exception("AUTOARM Unable to restore saved state")
+            return
+        if not data:
+            return
+        for saved in data.get("interventions", []):
+            try:
+                intervention: Intervention | None = Intervention.from_dict(saved)
+            except Exception as e:
+                _LOGGER.warning("AUTOARM Skipping unreadable saved intervention %s: %s", saved, e)
+                continue
+            if intervention is None:
+                _LOGGER.warning("AUTOARM Skipping invalid saved intervention %s", saved)
+            else:
+                self.interventions.add(intervention)
+        self.interventions.evict(dt_util.now())
+        self.pre_pending_state = alarm_state_as_enum(data.get("pre_pending_state"))
+        self.restored_calendar_states = {
+            event_id: state
+            for event_id, state_str in data.get("calendar_previous_states", {}).items()
+            if (state := alarm_state_as_enum(state_str)) is not None
+        }
+        _LOGGER.info(
+            "AUTOARM Restored %s interventions and %s calendar events",
+            len(self.interventions),
+            len(self.restored_calendar_states),
+        )
+
+    def save_state(self) -> None:
+        """Schedule a write, batching changes made within the save delay into one"""
+        self.save_pending = True
+        self.store.async_delay_save(self.saved_state, STORE_SAVE_DELAY)
+
+    def saved_state(self) -> dict[str, Any]:
+        """State to write, called by the store when a delayed save falls due"""
+        self.save_pending = False
+        return {
+            "interventions": [intervention.as_dict() for intervention in self.interventions],
+            "pre_pending_state": str(self.pre_pending_state) if self.pre_pending_state is not None else None,
+            "calendar_previous_states": {
+                event.id: str(event.previous_state)
+                for cal in self.calendars
+                for event in cal.tracked_events.values()
+                if event.previous_state is not None
+            },
+        }
+
+    def restored_previous_state(self, event_id: str) -> AlarmControlPanelState | None:
+        """State before a calendar event that was already tracked before the last restart"""
+        return self.restored_calendar_states.get(event_id)
+
     async def initialize_calendar(self) -> None:
         """Configure calendar polling (optional)"""
         stage: str = "calendar"
@@ -621,15 +821,18 @@ class AlarmArmer:
             self.app_health_tracker.record_initialization_error(stage)
             _LOGGER.exception("AUTOARM Unable to access calendar platform")
             return
-        for calendar_config in self.calendar_configs:
-            tracked_calendar = TrackedCalendar(
-                self.hass, calendar_config, self.calendar_no_event_mode, self, self.app_health_tracker
-            )
-            await tracked_calendar.initialize(platform)
-            self.calendars.append(tracked_calendar)
+        tracked_calendars: list[TrackedCalendar] = [
+            TrackedCalendar(self.hass, calendar_config, self.calendar_no_event_mode, self, self.app_health_tracker)
+            for calendar_config in self.calendar_configs
+        ]
+        self.calendars.extend(tracked_calendars)
+        # initial polls run concurrently, each bounded by its own timeout so one slow calendar can't hold up the rest
+        await asyncio.gather(*(tracked_calendar.initialize(platform) for tracked_calendar in tracked_calendars))
 
     async def initialize_logic(self) -> None:
         stage: str = "logic"
+        self.transition_table = None
+        compiled_keys: set[str] = set()
         for state_str, raw_condition in DEFAULT_TRANSITIONS.items():
             if state_str not in self.transition_config:
                 _LOGGER.info("AUTOARM Defaulting transition condition for %s", state_str)
@@ -644,19 +847,14 @@ class AlarmArmer:
             else:
                 try:
                     state = AlarmControlPanelState(state_str)
-                    cond: ConditionCheckerType | None = await self.hass_api.build_condition(
-                        condition_config, strict=True, validate=True, name=state_str
+                    compiled: CompiledCondition = await self.hass_api.compile_condition(
+                        condition_config, validate=True, name=state_str
                     )
-
-                    if cond:
-                        # re-run without strict wrapper
-                        cond = await self.hass_api.build_condition(condition_config, name=state_str)
-                    if cond:
-                        _LOGGER.debug(f"AUTOARM Validated transition logic for {state_str}")
-                        self.transitions[state] = cond
-                    else:
-                        _LOGGER.warning(f"AUTOARM Failed to validate transition logic for {state_str}")
-                        error = "Condition validation failed"
+                    compiled.verify()
+                    if compiled.key:
+                        compiled_keys.add(compiled.key)
+                    _LOGGER.debug(f"AUTOARM Validated transition logic for {state_str}")
+                    self.transitions[state] = native_condition(compiled.config, compiled.checker, name=state_str)
                 except ValueError as ve:
                     self.app_health_tracker.record_initialization_error(stage)
                     error = f"Invalid state {ve}"
@@ -686,6 +884,8 @@ class AlarmArmer:
                     issue_map={"state": state_str, "error": error},
                     severity=ir.IssueSeverity.ERROR,
                 )
+        self.hass_api.prune_condition_cache(compiled_keys)
+        self.transition_table = TransitionTable.build(self.transitions, self.occupied_defaults)
 
     async def async_shutdown(self, _event: Event) -> None:
         _LOGGER.info("AUTOARM shut down event received")
@@ -694,10 +894,21 @@ class AlarmArmer:
 
     def shutdown(self) -> None:
         _LOGGER.info("AUTOARM shutting down")
+        if self.save_pending:
+            # the store outlives this armer, so write now rather than leave a pending save calling
+            # saved_state after the calendars are cleared below
+            self.hass.async_create_task(self.store.async_save(self.saved_state()))
         for calendar in self.calendars:
             calendar.shutdown()
         while self.unsubscribes:
             unlisten(self.unsubscribes.pop())
+        self.scheduled_jobs.cancel_all()
+        unlisten(self.coalesce_unsub)
+        self.coalesce_unsub = None
+        if self.notifier:
+            self.notifier.shutdown()
+        self.coalesced_sources = []
+        self.coalesced_entity_ids = []
         unlisten(self.stop_listener)
         self.stop_listener = None
         _LOGGER.info("AUTOARM shut down")
@@ -716,29 +927,36 @@ class AlarmArmer:
 
     def is_occupied(self) -> bool | None:
         """Ternary - true at least one person entity has state home, false none of them, null if no occupants defined"""
-        if self.occupants:
-            return any(safe_state(self.hass.states.get(p)) == STATE_HOME for p in self.occupants)
-        return None
+        return self.occupancy.is_occupied()
 
     def at_home(self) -> list[str] | None:
-        if self.occupants:
-            return [p for p in self.occupants if safe_state(self.hass.states.get(p)) == STATE_HOME]
-        return None
+        return self.occupancy.at_home()
 
     def not_home(self) -> list[str] | None:
-        if self.occupants:
-            return [p for p in self.occupants if safe_state(self.hass.states.get(p)) != STATE_HOME]
-        return None
+        return self.occupancy.not_home()
 
     def is_unoccupied(self) -> bool | None:
         """Ternary - false at least one person entity has state home, true none of them, null if no occupants defined"""
-        if self.occupants:
-            return all(safe_state(self.hass.states.get(p)) != STATE_HOME for p in self.occupants)
-        return None
+        return self.occupancy.is_unoccupied()
 
     def is_night(self) -> bool:
         return safe_state(self.hass.states.get("sun.sun")) == STATE_BELOW_HORIZON
 
+    def snapshot(self) -> StateSnapshot:
+        """Read all the decision inputs in one pass, with occupancy taken from the index"""
+        at_home: list[str] | None = self.occupancy.at_home()
+        not_home: list[str] | None = self.occupancy.not_home()
+        return StateSnapshot(
+            armed_state=self.armed_state(),
+            occupied=self.occupancy.is_occupied(),
+            unoccupied=self.occupancy.is_unoccupied(),
+            at_home=tuple(at_home) if at_home is not None else None,
+            not_home=tuple(not_home) if not_home is not None else None,
+            night=self.is_night(),
+            active_calendar_event=self.active_calendar_event(),
+            captured_at=dt_util.now(),
+        )
+
     def armed_state(self) -> AlarmControlPanelState:
         raw_state: str | None = safe_state(self.hass.states.get(self.alarm_panel))
         alarm_state: AlarmControlPanelState | None = alarm_state_as_enum(raw_state)
@@ -778,6 +996,7 @@ class AlarmArmer:
 
     async def pending_state(self, source: ChangeSource | None, change_context: dict[str, Any] | None = None) -> None:
         self.pre_pending_state = self.armed_state()
+        self.save_state()
         change_context = change_context or {}
         change_context.update({
             "source": str(source),
@@ -800,8 +1019,40 @@ class AlarmArmer:
             return
         await self.reset_armed_state(**kwargs)
 
+    async def request_reset(self, source: ChangeSource, entity_id: str | None = None) -> None:
+        """Reset armed state for an automatic trigger, collapsing bursts within the coalesce window into one reset"""
+        if not self.coalesce_window:
+            await self.reset_armed_state(source=source, entity_id=entity_id)
+            return
+        if source not in self.coalesced_sources:
+            self.coalesced_sources.append(source)
+        if entity_id is not None and entity_id not in self.coalesced_entity_ids:
+            self.coalesced_entity_ids.append(entity_id)
+        if self.coalesce_unsub is None:
+            _LOGGER.debug("AUTOARM Coalescing resets from %s for %s", source, self.coalesce_window)
+            self.coalesce_unsub = async_call_later(self.hass, self.coalesce_window, self.on_coalesced_reset)
+
+    @callback
+    async def on_coalesced_reset(self, _now: dt.datetime) -> None:
+        self.coalesce_unsub = None
+        sources: list[ChangeSource] = self.coalesced_sources
+        entity_ids: list[str] = self.coalesced_entity_ids
+        self.coalesced_sources = []
+        self.coalesced_entity_ids = []
+        if not sources:
+            return
+        # occupancy resets override previous interventions, so take precedence over sun events in the same burst
+        source: ChangeSource = ChangeSource.OCCUPANCY if ChangeSource.OCCUPANCY in sources else sources[-1]
+        _LOGGER.debug("AUTOARM Coalesced reset for %s as %s", sources, source)
+        await self.reset_armed_state(source=source, coalesced_sources=sources, coalesced_entity_ids=entity_ids)
+
     async def reset_armed_state(
-        self, intervention: Intervention | None = None, source: ChangeSource | None = None
+        self,
+        intervention: Intervention | None = None,
+        source: ChangeSource | None = None,
+        coalesced_sources: list[ChangeSource] | None = None,
+        entity_id: str | None = None,
+        coalesced_entity_ids: list[str] | None = None,
     ) -> str | None:
         """Logic to automatically work out appropriate current armed state"""
         state: AlarmControlPanelState | None = None
@@ -809,6 +1060,8 @@ class AlarmArmer:
         must_change_state: bool = False
         last_state_intervention: Intervention | None = None
         active_calendar_event: TrackedCalendarEvent | None = None
+        snapshot: StateSnapshot | None = None
+        rate_limited_by: str | None = None
 
         if source is None and intervention is not None:
             source = intervention.source
@@ -819,10 +1072,11 @@ class AlarmArmer:
         )
         reset_decision: str = "no_change"
         try:
-            existing_state = self.armed_state()
+            snapshot = self.snapshot()
+            existing_state = snapshot.armed_state
             state = existing_state
             if self.calendars:
-                active_calendar_event = self.active_calendar_event()
+                active_calendar_event = snapshot.active_calendar_event
                 if active_calendar_event:
                     cal_state: AlarmControlPanelState = active_calendar_event.arming_state
                     if (
@@ -866,7 +1120,7 @@ class AlarmArmer:
                 intervention
                 or source in (ChangeSource.CALENDAR, ChangeSource.OCCUPANCY)
                 or must_change_state
-                or (self.is_unoccupied() and state in (AlarmControlPanelState.DISARMED, AlarmControlPanelState.ARMED_HOME))
+                or (snapshot.unoccupied and state in (AlarmControlPanelState.DISARMED, AlarmControlPanelState.ARMED_HOME))
             ):
                 _LOGGER.debug("AUTOARM Ignoring previous interventions")
             else:
@@ -880,12 +1134,24 @@ class AlarmArmer:
                     )
                     reset_decision = "ignore_after_manual_intervention"
                     return existing_state
-            state = self.determine_state()
+            state = self.determine_state(snapshot)
             if state is not None and state != AlarmControlPanelState.PENDING and state != existing_state:
                 reset_decision = "change_state"
+                change_context: dict[str, Any] = {"reset_decision": reset_decision, "caller": "reset_armed_state"}
+                if coalesced_sources:
+                    change_context["coalesced_sources"] = [str(s) for s in coalesced_sources]
                 state = await self.arm(
-                    state, source=source, change_context={"reset_decision": reset_decision, "caller": "reset_armed_state"}
+                    state,
+                    source=source,
+                    change_context=change_context,
+                    snapshot=snapshot,
+                    coalesced_sources=coalesced_sources,
+                    entity_id=entity_id,
+                    coalesced_entity_ids=coalesced_entity_ids,
                 )
+                rate_limited_by = change_context.get("rate_limited_by")
+                if rate_limited_by:
+                    reset_decision = "rate_limited"
 
         finally:
             self.hass.states.async_set(
@@ -895,14 +1161,17 @@ class AlarmArmer:
                     "new_state": str(state),
                     "old_state": str(existing_state),
                     "source": str(source),
+                    "coalesced_sources": [str(s) for s in coalesced_sources] if coalesced_sources else None,
                     "active_calendar_event": deobjectify(active_calendar_event.event) if active_calendar_event else None,
-                    "occupied": self.is_occupied(),
-                    "night": self.is_night(),
+                    "occupied": snapshot.occupied if snapshot else None,
+                    "night": snapshot.night if snapshot else None,
                     "must_change_state": str(must_change_state),
                     "last_state_intervention": deobjectify(last_state_intervention),
                     "intervention": intervention.as_dict() if intervention else None,
                     "time": dt_util.now().isoformat(),
                     "reset_decision": reset_decision,
+                    "rate_limited_by": rate_limited_by,
+                    "snapshot": snapshot.as_dict() if snapshot else None,
                 },
             )
 
@@ -916,20 +1185,15 @@ class AlarmArmer:
             return True
         return False
 
-    def determine_state(self) -> AlarmControlPanelState | None:
+    def determine_state(self, snapshot: StateSnapshot | None = None) -> AlarmControlPanelState | None:
         """Compute a new state using occupancy, sun and transition conditions"""
         evaluated_state: AlarmControlPanelState | None = None
-        active_calendar_event: TrackedCalendarEvent | None = self.active_calendar_event()
-        condition_vars: ConditionVariables = ConditionVariables(
-            occupied=self.is_occupied(),
-            unoccupied=self.is_unoccupied(),
-            night=self.is_night(),
-            state=self.armed_state(),
-            calendar_event=active_calendar_event.event if active_calendar_event else None,
-            occupied_defaults=self.occupied_defaults,
-            at_home=self.at_home(),
-            not_home=self.not_home(),
-        )
+        snapshot = snapshot or self.snapshot()
+        condition_vars: ConditionVariables = snapshot.condition_variables(self.occupied_defaults)
+        if self.transition_table is not None:
+            evaluated_state = self.transition_table.lookup(condition_vars)
+            _LOGGER.debug("AUTOARM Computed state as %s from transition table", evaluated_state)
+            return evaluated_state
         for state, checker in self.transitions.items():
             if self.hass_api.evaluate_condition(checker, condition_vars):
                 _LOGGER.debug("AUTOARM Computed state as %s from condition", state)
@@ -951,6 +1215,10 @@ class AlarmArmer:
         arming_state: AlarmControlPanelState | None,
         source: ChangeSource | None = None,
         change_context: dict[str, Any] | None = None,
+        snapshot: StateSnapshot | None = None,
+        coalesced_sources: list[ChangeSource] | None = None,
+        entity_id: str | None = None,
+        coalesced_entity_ids: list[str] | None = None,
     ) -> AlarmControlPanelState | None:
         """Change alarm panel state
 
@@ -959,6 +1227,10 @@ class AlarmArmer:
             arming_state (str, optional): _description_. Defaults to None.
             source (str,optional): Source of the change, for example 'calendar' or 'button'
             change_context (dict,optional): Detailed context for the reason arm triggered
+            snapshot (StateSnapshot,optional): Decision inputs already read by the caller, reused for the change event
+            coalesced_sources (list,optional): All sources merged into a coalesced reset, for notifications
+            entity_id (str,optional): Entity that triggered the change, for per-entity rate limits
+            coalesced_entity_ids (list,optional): All entities merged into a coalesced reset, for per-entity rate limits
 
         Returns:
         -------
@@ -968,51 +1240,68 @@ class AlarmArmer:
         _LOGGER.debug("AUTOARM arm(arming_state=%s,source=%s,change_context=%s", arming_state, source, change_context)
         if arming_state is None:
             return None
+        # nothing below awaits, so arm requests are applied whole and in call order on the event loop
         if self.armed_state() == arming_state:
             return None
-        if self.arming_in_progress.is_set():
-            _LOGGER.warning("AUTOARM arming already in progress, skipping for %s", source)
-            return None
-        if self.rate_limiter.triggered():
-            _LOGGER.debug("AUTOARM Rate limit triggered by %s, skipping arm", source)
+        entity_ids: list[str] = coalesced_entity_ids or ([entity_id] if entity_id else [])
+        rate_limited_by: str | None = self.rate_limiter.rejected_by(source, *entity_ids)
+        if rate_limited_by:
+            _LOGGER.debug(
+                "AUTOARM Rate limit %s triggered by %s, skipping arm, next allowed in %.1fs",
+                rate_limited_by,
+                source,
+                self.rate_limiter.reset_in(source, *entity_ids),
+            )
+            if change_context is not None:
+                # lets reset_armed_state report the limiter on the last calculation sensor
+                change_context["rate_limited_by"] = rate_limited_by
+            self.hass_api.fire_event(
+                event_name="rate_limited",
+                event_data={
+                    "panel": self.alarm_panel,
+                    "requested_state": arming_state,
+                    "change_source": source,
+                    "entity_id": entity_id,
+                    "rate_limited_by": rate_limited_by,
+                    "context": change_context or {},
+                },
+            )
             return None
         try:
-            self.arming_in_progress.set()
             existing_state: AlarmControlPanelState | None = self.armed_state()
-            if arming_state != existing_state:
-                attrs: dict[str, str] = {}
-                panel_state: State | None = self.hass.states.get(self.alarm_panel)
-                if panel_state:
-                    attrs.update(panel_state.attributes)
-                attrs[ATTR_CHANGED_BY] = f"{DOMAIN}.{source}"
-                self.hass.states.async_set(entity_id=self.alarm_panel, new_state=str(arming_state), attributes=attrs)
-
-                _LOGGER.info("AUTOARM Setting %s from %s to %s for %s", self.alarm_panel, existing_state, arming_state, source)
-                if self.notifier and source and arming_state:
-                    await self.notifier.notify(source=source, from_state=existing_state, to_state=arming_state)
-
-                self.hass_api.fire_event(
-                    event_name="change",
-                    event_data={
-                        "panel": self.alarm_panel,
-                        "panel_state": panel_state,
-                        "original_state": existing_state,
-                        "new_state": arming_state,
-                        "change_source": source,
-                        "occupied": self.is_occupied(),
-                        "night": self.is_night(),
-                        "context": change_context or {},
-                    },
+            attrs: dict[str, str] = {}
+            panel_state: State | None = self.hass.states.get(self.alarm_panel)
+            if panel_state:
+                attrs.update(panel_state.attributes)
+            attrs[ATTR_CHANGED_BY] = f"{DOMAIN}.{source}"
+            self.hass.states.async_set(entity_id=self.alarm_panel, new_state=str(arming_state), attributes=attrs)
+
+            _LOGGER.info("AUTOARM Setting %s from %s to %s for %s", self.alarm_panel, existing_state, arming_state, source)
+            self.hass_api.fire_event(
+                event_name="change",
+                event_data={
+                    "panel": self.alarm_panel,
+                    "panel_state": panel_state,
+                    "original_state": existing_state,
+                    "new_state": arming_state,
+                    "change_source": source,
+                    "occupied": snapshot.occupied if snapshot else self.is_occupied(),
+                    "night": snapshot.night if snapshot else self.is_night(),
+                    "context": change_context or {},
+                },
+            )
+            if self.notifier and source and arming_state:
+                self.notifier.enqueue(
+                    source=source,
+                    from_state=existing_state,
+                    to_state=arming_state,
+                    coalesced_sources=coalesced_sources,
                 )
-                return arming_state
-            _LOGGER.debug("AUTOARM Skipping arm for %s, as %s already %s", source, self.alarm_panel, arming_state)
-            return existing_state
         except Exception as e:
             _LOGGER.error("AUTOARM Failed to arm: %s", e)
             self.app_health_tracker.record_runtime_error()
-        finally:
-            self.arming_in_progress.clear()
-        return None
+            return None
+        return arming_state
 
     def schedule_state(
         self,
@@ -1020,51 +1309,59 @@ class AlarmArmer:
         state: AlarmControlPanelState | None,
         intervention: Intervention | None,
         source: ChangeSource | None = None,
-    ) -> None:
-        source = source or intervention.source if intervention else None
+        entity_id: str | None = None,
+    ) -> str:
+        source = source or (intervention.source if intervention else None)
+        # a later delayed reset for the same source replaces any still pending
+        job_id: str | None = reset_job_id(source) if state is None else None
 
         job: Callable[[dt.datetime], Coroutine[Any, Any, None] | None]
         if state is None:
             _LOGGER.debug("AUTOARM Delayed reset, triggered at: %s, source%s", trigger_time, source)
-            job = partial(self.delayed_reset_armed_state, intervention=intervention, source=source, requested_at=dt_util.now())
+            job = partial(
+                self.delayed_reset_armed_state,
+                intervention=intervention,
+                source=source,
+                entity_id=entity_id,
+                requested_at=dt_util.now(),
+            )
         else:
             _LOGGER.debug("AUTOARM Delayed arm %s, triggered at: %s, source%s", state, trigger_time, source)
 
-            job = partial(self.delayed_arm, arming_state=state, source=source, requested_at=dt_util.now())
+            job = partial(self.delayed_arm, arming_state=state, source=source, entity_id=entity_id, requested_at=dt_util.now())
 
-        self.unsubscribes.append(
-            async_track_point_in_time(
-                self.hass,
-                job,
-                trigger_time,
-            )
-        )
+        return self.scheduled_jobs.schedule(trigger_time, job, job_id)
+
+    @property
+    def intervention_ttl(self) -> int:
+        """Minutes an intervention is remembered for"""
+        return int(self.interventions.ttl.total_seconds() // 60)
+
+    @intervention_ttl.setter
+    def intervention_ttl(self, minutes: int) -> None:
+        self.interventions.ttl = dt.timedelta(minutes=minutes)
 
     def record_intervention(self, source: ChangeSource, state: AlarmControlPanelState | None) -> Intervention:
         intervention = Intervention(dt_util.now(), source, state)
-        self.interventions.append(intervention)
+        self.interventions.add(intervention)
+        self.save_state()
         self.hass.states.async_set(f"sensor.{DOMAIN}_last_intervention", source, attributes=intervention.as_dict())
 
         return intervention
 
     def has_intervention_since(self, cutoff: dt.datetime) -> bool:
         """Has there been a manual intervention since the cutoff time"""
-        if not self.interventions:
-            return False
-        return any(intervention.created_at > cutoff for intervention in self.interventions)
+        return self.interventions.has_since(cutoff)
 
     def last_state_intervention(self) -> Intervention | None:
-        candidates: list[Intervention] = [i for i in self.interventions if i.state is not None]
-        if candidates:
-            return candidates[-1]
-        return None
+        return self.interventions.latest_state
 
     @callback
     async def on_sunrise(self, *args: Any) -> None:
         _LOGGER.debug("AUTOARM Sunrise")
         now = dt_util.now()
         if not self.sunrise_earliest or now.time() >= self.sunrise_earliest:
-            await self.reset_armed_state(source=ChangeSource.SUNRISE)
+            await self.request_reset(ChangeSource.SUNRISE)
         else:
             _LOGGER.debug("AUTOARM Rescheduling delayed sunrise action to %s", self.sunrise_earliest)
             self.schedule_state(
@@ -1077,14 +1374,14 @@ class AlarmArmer:
     @callback
     async def on_sunrise_latest(self, *args: Any) -> None:
         _LOGGER.debug("AUTOARM Sunrise latest cutoff reached")
-        await self.reset_armed_state(source=ChangeSource.SUNRISE)
+        await self.request_reset(ChangeSource.SUNRISE)
 
     @callback
     async def on_sunset(self, *args: Any) -> None:
         _LOGGER.debug("AUTOARM Sunset")
         now = dt_util.now()
         if not self.sunset_earliest or now.time() >= self.sunset_earliest:
-            await self.reset_armed_state(source=ChangeSource.SUNSET)
+            await self.request_reset(ChangeSource.SUNSET)
         else:
             _LOGGER.debug("AUTOARM Rescheduling delayed sunset action to %s", self.sunset_earliest)
             self.schedule_state(
@@ -1097,7 +1394,7 @@ class AlarmArmer:
     @callback
     async def on_sunset_latest(self, *args: Any) -> None:
         _LOGGER.debug("AUTOARM Sunset latest cutoff reached")
-        await self.reset_armed_state(source=ChangeSource.SUNSET)
+        await self.request_reset(ChangeSource.SUNSET)
 
     @callback
     async def on_mobile_action(self, event: Event) -> None:
@@ -1129,9 +1426,11 @@ class AlarmArmer:
         _LOGGER.debug("AUTOARM Alarm %s Button: %s", state, event)
         intervention = self.record_intervention(source=ChangeSource.BUTTON, state=state)
         if delay:
-            self.schedule_state(dt_util.now() + delay, state, intervention, source=ChangeSource.BUTTON)
+            self.schedule_state(
+                dt_util.now() + delay, state, intervention, source=ChangeSource.BUTTON, entity_id=event.data.get("entity_id")
+            )
             if self.notifier:
-                await self.notifier.notify(
+                self.notifier.enqueue(
                     ChangeSource.BUTTON,
                     from_state=self.armed_state(),
                     to_state=state,
@@ -1148,6 +1447,7 @@ class AlarmArmer:
                     "delay": str(delay),
                     "event_type": event.event_type,
                 },
+                entity_id=event.data.get("entity_id"),
             )
 
     @callback
@@ -1155,15 +1455,18 @@ class AlarmArmer:
         _LOGGER.debug("AUTOARM Reset Button: %s", event)
         intervention = self.record_intervention(source=ChangeSource.BUTTON, state=None)
         if delay:
-            self.schedule_state(dt_util.now() + delay, None, intervention, ChangeSource.BUTTON)
+            self.schedule_state(dt_util.now() + delay, None, intervention, ChangeSource.BUTTON, event.data.get("entity_id"))
             if self.notifier:
-                await self.notifier.notify(
+                self.notifier.enqueue(
                     ChangeSource.BUTTON,
                     message=f"Alarm will be reset in {delay}",
                     title="Alarm reset wait initiated",
                 )
         else:
-            await self.reset_armed_state(intervention=self.record_intervention(source=ChangeSource.BUTTON, state=None))
+            await self.reset_armed_state(
+                intervention=self.record_intervention(source=ChangeSource.BUTTON, state=None),
+                entity_id=event.data.get("entity_id"),
+            )
 
     @callback
     async def on_occupancy_change(self, event: Event[EventStateChangedData]) -> None:
@@ -1175,6 +1478,7 @@ class AlarmArmer:
 
         """
         entity_id, old, new, new_attributes = self._extract_event(event)
+        self.occupancy.update(entity_id, new)
         if old == new:
             _LOGGER.debug(
                 "AUTOARM Occupancy Non-state Change: %s, state:%s->%s, event: %s, attrs:%s",
@@ -1188,12 +1492,19 @@ class AlarmArmer:
         _LOGGER.debug(
             "AUTOARM Occupancy state Change: %s, state:%s->%s, event: %s, attrs:%s", entity_id, old, new, event, new_attributes
         )
+        # only the settled state is evaluated, so a new change supersedes any delayed reset still pending
+        if self.scheduled_jobs.cancel(OCCUPANCY_RESET_JOB):
+            _LOGGER.debug("AUTOARM Occupancy change for %s cancelled pending delayed reset", entity_id)
         if new in self.occupied_delay:
             self.schedule_state(
-                dt_util.now() + self.occupied_delay[new], state=None, intervention=None, source=ChangeSource.OCCUPANCY
+                dt_util.now() + self.occupied_delay[new],
+                state=None,
+                intervention=None,
+                source=ChangeSource.OCCUPANCY,
+                entity_id=entity_id,
             )
         else:
-            await self.reset_armed_state(source=ChangeSource.OCCUPANCY)
+            await self.request_reset(ChangeSource.OCCUPANCY, entity_id=entity_id)
 
     @callback
     async def on_panel_change(self, event: Event[EventStateChangedData]) -> None:
@@ -1226,15 +1537,14 @@ class AlarmArmer:
             await self.reset_armed_state(source=ChangeSource.ZOMBIFICATION)
         elif new != old:
             if self.notifier:
-                await self.notifier.notify(ChangeSource.ALARM_PANEL, old_state, new_state)
+                self.notifier.enqueue(ChangeSource.ALARM_PANEL, old_state, new_state)
         else:
             _LOGGER.debug("AUTOARM panel change leaves state unchanged at %s", new)
 
     @callback
     async def housekeeping(self, triggered_at: dt.datetime) -> None:
         _LOGGER.debug("AUTOARM Housekeeping starting, triggered at %s", triggered_at)
-        now = dt_util.now()
-        self.interventions = [i for i in self.interventions if now < i.created_at + dt.timedelta(minutes=self.intervention_ttl)]
+        self.interventions.evict(dt_util.now())
         for cal in self.calendars:
-            await cal.prune_events()
+            await cal.expire_events()
         _LOGGER.debug("AUTOARM Housekeeping finished")
@@ -1,18 +1,21 @@
+import asyncio
 import datetime as dt
 import logging
 import re
 from collections.abc import Callable
-from typing import TYPE_CHECKING, cast
+from typing import TYPE_CHECKING, Any, cast
 
 import homeassistant.util.dt as dt_util
 from homeassistant.auth import HomeAssistant
 from homeassistant.components.alarm_control_panel.const import AlarmControlPanelState
 from homeassistant.components.calendar import CalendarEntity, CalendarEvent
 from homeassistant.const import CONF_ALIAS, CONF_ENTITY_ID
+from homeassistant.helpers import config_validation as cv
 from homeassistant.helpers import entity_platform
 from homeassistant.helpers.event import (
+    EventStateChangedData,
     async_track_point_in_time,
-    async_track_utc_time_change,
+    async_track_state_change_event,
 )
 from homeassistant.helpers.typing import ConfigType
 
@@ -20,18 +23,26 @@ from custom_components.autoarm.helpers import AppHealthTracker, alarm_state_as_e
 
 from .const import (
     ALARM_STATES,
+    CALENDAR_MAX_POLL_INTERVAL,
+    CALENDAR_MIN_POLL_INTERVAL,
+    CALENDAR_PUSH_POLL_INTERVAL,
+    CALENDAR_TRACKING_POLL,
+    CALENDAR_TRACKING_PUSH,
     CONF_CALENDAR_EVENT_STATES,
     CONF_CALENDAR_POLL_INTERVAL,
+    CONF_CALENDAR_TRACKING,
     DOMAIN,
     NO_CAL_EVENT_MODE_AUTO,
     ChangeSource,
 )
 
 if TYPE_CHECKING:
-    from homeassistant.core import CALLBACK_TYPE
+    from homeassistant.core import CALLBACK_TYPE, Event
 
 _LOGGER = logging.getLogger(__name__)
 
+CALENDAR_INIT_TIMEOUT_SECONDS = 20.0
+
 
 def unlisten(listener: Callable[[], None] | None) -> None:
     if listener:
@@ -63,7 +74,7 @@ class TrackedCalendarEvent:
         self.end_listener: CALLBACK_TYPE | None = None
         self.armer: AlarmArmer = armer  # type: ignore # ruff:ignore[undefined-name]
         self.hass: HomeAssistant = hass
-        self.previous_state: AlarmControlPanelState | None = armer.armed_state()
+        self.previous_state: AlarmControlPanelState | None = armer.restored_previous_state(self.id) or armer.armed_state()
         self.track_status: str = "pending"
 
     async def initialize(self) -> None:
@@ -158,6 +169,7 @@ class TrackedCalendarEvent:
                     "recurring": self.is_recurring(),
                     "overridable_event": overridable_event,
                 },
+                entity_id=self.calendar_id,
             )
         self.hass.states.async_set(
             f"sensor.{DOMAIN}_last_calendar_event",
@@ -269,13 +281,29 @@ class TrackedCalendar:
         self.no_event_mode: str | None = no_event_mode
         self.alias: str = cast("str", calendar_config.get(CONF_ALIAS, ""))
         self.entity_id: str = cast("str", calendar_config.get(CONF_ENTITY_ID))
+        self.tracking: str = calendar_config.get(CONF_CALENDAR_TRACKING, CALENDAR_TRACKING_POLL)
         self.poll_interval: int = calendar_config.get(CONF_CALENDAR_POLL_INTERVAL, 30)
-        self.state_mappings: dict[str, list[str]] = cast(
-            "dict[str, list[str]]", calendar_config.get(CONF_CALENDAR_EVENT_STATES)
+        if self.tracking == CALENDAR_TRACKING_PUSH:
+            self.poll_interval = max(self.poll_interval, CALENDAR_PUSH_POLL_INTERVAL)
+        # current interval in minutes, backing off from the poll interval while nothing is scheduled
+        self.interval: int = self.poll_interval
+        self.max_interval: int = max(self.poll_interval, CALENDAR_MAX_POLL_INTERVAL)
+        self.next_poll: dt.datetime | None = None
+        self.init_timeout: float = CALENDAR_INIT_TIMEOUT_SECONDS
+        self.state_mappings: dict[str, list[str | re.Pattern[str]]] = cast(
+            "dict[str, list[str | re.Pattern[str]]]", calendar_config.get(CONF_CALENDAR_EVENT_STATES)
         )
+        # compiled once, in match priority order, since every event is matched on every poll
+        self.state_names: list[tuple[str, str]] = [(state_str, state_str.upper()) for state_str in ALARM_STATES]
+        self.state_patterns: list[tuple[str, list[re.Pattern[str]]]] = [
+            (state_str, [re.compile(pattern) for pattern in cv.ensure_list(patterns)])
+            for state_str, patterns in self.state_mappings.items()
+        ]
         # self.notify_on_change: str = calendar_config.get(CONF_CALENDAR_ENTRY_NOTIFICATIONS, ENTRY_NOTIFICATION_MATCHED)
         self.tracked_events: dict[str, TrackedCalendarEvent] = {}
         self.poller_listener: CALLBACK_TYPE | None = None
+        self.state_listener: CALLBACK_TYPE | None = None
+        self.reconcile_lock: asyncio.Lock = asyncio.Lock()
 
     async def initialize(self, calendar_platform: entity_platform.EntityPlatform) -> None:
         try:
@@ -288,22 +316,25 @@ class TrackedCalendar:
             else:
                 self.calendar_entity = calendar_entity
                 _LOGGER.info(
-                    "AUTOARM Configured calendar %s from %s, polling every %s minutes",
+                    "AUTOARM Configured calendar %s from %s, %s tracking, polling from every %s minutes",
                     self.entity_id,
                     calendar_platform.platform_name,
+                    self.tracking,
                     self.poll_interval,
                 )
-                self.poller_listener = async_track_utc_time_change(
-                    self.hass,
-                    self.on_timed_poll,
-                    "*",
-                    minute=f"/{self.poll_interval}",
-                    second=0,
-                    local=True,
-                )
+                if self.tracking == CALENDAR_TRACKING_PUSH:
+                    self.state_listener = async_track_state_change_event(self.hass, [self.entity_id], self.on_calendar_change)
                 self.enabled = True
-                # force an initial poll
-                await self.match_events()
+                # force an initial poll, which schedules the next
+                try:
+                    async with asyncio.timeout(self.init_timeout):
+                        await self.reconcile()
+                except TimeoutError:
+                    self.app_health_tracker.record_initialization_error("calendar_timeout")
+                    _LOGGER.warning(
+                        "AUTOARM Calendar %s initial poll timed out after %ss, will retry", self.entity_id, self.init_timeout
+                    )
+                    self.schedule_poll(None)
 
         except Exception as _e:
             self.app_health_tracker.record_runtime_error()
@@ -312,16 +343,98 @@ class TrackedCalendar:
     def shutdown(self) -> None:
         unlisten(self.poller_listener)
         self.poller_listener = None
+        unlisten(self.state_listener)
+        self.state_listener = None
         for tracked_event in self.tracked_events.values():
             tracked_event.shutdown()
         self.enabled = False
+        self.next_poll = None
         self.tracked_events.clear()
 
     async def on_timed_poll(self, _called_time: dt.datetime) -> None:
         """Check for new and dead events, entry point for the timed calendar tracker listener"""
         _LOGGER.debug("AUTOARM Calendar Poll")
-        await self.match_events()
-        await self.prune_events()
+        await self.reconcile()
+
+    async def on_calendar_change(self, event: "Event[EventStateChangedData]") -> None:
+        """Check for new and dead events when the calendar entity changes, with push tracking"""
+        new_state = event.data["new_state"]
+        _LOGGER.debug("AUTOARM Calendar %s changed to %s", self.entity_id, new_state.state if new_state else None)
+        await self.reconcile()
+
+    def poll_window(self) -> tuple[dt.datetime, dt.datetime]:
+        """Span of events to track on this poll, from recently started until just beyond the latest possible next poll"""
+        now_local = dt_util.now()
+        return now_local - dt.timedelta(minutes=15), now_local + dt.timedelta(minutes=self.backoff_interval() + 5)
+
+    def backoff_interval(self) -> int:
+        return min(self.interval * 2, self.max_interval)
+
+    def schedule_poll(self, events: list[CalendarEvent] | None, changed: bool = False) -> None:
+        """Choose the next poll from the events just fetched, or keep the current interval if the fetch failed
+
+        Doubles the interval, up to the maximum, while there are no events in the poll window, and returns to the
+        poll interval as soon as there are. The next poll is brought forward to the next event start or end, and
+        rounded up to a whole minute so calendars on the same interval poll together
+        """
+        if not self.enabled:
+            return
+        now_local: dt.datetime = dt_util.now()
+        if events is not None:
+            if not events and not changed and not self.tracked_events:
+                self.interval = self.backoff_interval()
+            else:
+                self.interval = self.poll_interval
+        next_poll: dt.datetime = now_local + dt.timedelta(minutes=self.interval)
+        boundaries: list[dt.datetime] = [
+            boundary
+            for event in events or []
+            for boundary in (event.start_datetime_local, event.end_datetime_local)
+            if boundary > now_local
+        ]
+        if boundaries:
+            next_poll = min(next_poll, max(min(boundaries), now_local + dt.timedelta(minutes=CALENDAR_MIN_POLL_INTERVAL)))
+        self.next_poll = (next_poll + dt.timedelta(seconds=59)).replace(second=0, microsecond=0)
+        unlisten(self.poller_listener)
+        self.poller_listener = async_track_point_in_time(self.hass, self.on_timed_poll, self.next_poll)
+        _LOGGER.debug("AUTOARM Calendar %s next poll at %s, interval %s minutes", self.entity_id, self.next_poll, self.interval)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "entity_id": self.entity_id,
+            "tracking": self.tracking,
+            "poll_interval": self.poll_interval,
+            "interval": self.interval,
+            "next_poll": self.next_poll.isoformat() if self.next_poll else None,
+            "tracked_events": len(self.tracked_events),
+        }
+
+    async def reconcile(self) -> None:
+        """Fetch a single window covering both the poll window and all tracked events, then diff against tracked events
+
+        New or changed events are only matched within the poll window, while any tracked event missing from
+        the wider fetch has been deleted from the calendar
+        """
+        # push and timed polls may overlap, and each must see the events tracked by the other
+        async with self.reconcile_lock:
+            # the next poll is always scheduled, keeping the current interval if anything fails
+            reconciled: list[CalendarEvent] | None = None
+            changed: bool = False
+            try:
+                start_dt, end_dt = self.poll_window()
+                tracked: list[TrackedCalendarEvent] = list(self.tracked_events.values())
+                fetch_start: dt.datetime = min((start_dt, *(t.event.start_datetime_local for t in tracked)))
+                fetch_end: dt.datetime = max((end_dt, *(t.event.end_datetime_local for t in tracked)))
+                events: list[CalendarEvent] = await self.calendar_entity.async_get_events(self.hass, fetch_start, fetch_end)
+                in_window: list[CalendarEvent] = [
+                    event for event in events if event.start_datetime_local < end_dt and event.end_datetime_local > start_dt
+                ]
+                changed = await self.match_events(in_window)
+                live_event_ids: set[str] = {TrackedCalendarEvent.event_id(self.calendar_entity.entity_id, e) for e in events}
+                changed = await self.prune_events(live_event_ids) or changed
+                reconciled = in_window
+            finally:
+                self.schedule_poll(reconciled, changed)
 
     def has_active_event(self) -> bool:
         """Is there any event matching a state pattern that is currently open"""
@@ -332,41 +445,25 @@ class TrackedCalendar:
         return [v for v in self.tracked_events.values() if v.is_current()]
 
     def match_event(self, summary: str | None, description: str | None) -> str | None:
-        for state_str in ALARM_STATES:
-            if summary and (state_str.upper() in summary):
+        """First alarm state named in upper case in the summary or description, otherwise the first with a matching pattern"""
+        texts: list[str] = [text for text in (summary, description) if text]
+        for state_str, name in self.state_names:
+            if any(name in text for text in texts):
                 return state_str
-            if description and (state_str.upper() in description):
-                return state_str
-        for state_str, patterns in self.state_mappings.items():
-            if (
-                summary
-                and any(
-                    re.search(
-                        patt,
-                        summary,
-                    )
-                    for patt in patterns
-                )
-            ) or (
-                description
-                and any(
-                    re.search(
-                        patt,
-                        description,
-                    )
-                    for patt in patterns
-                )
-            ):
+        for state_str, patterns in self.state_patterns:
+            if any(pattern.search(text) for pattern in patterns for text in texts):
                 return state_str
         return None
 
-    async def match_events(self) -> None:
-        """Query the calendar for events that match state patterns"""
-        now_local = dt_util.now()
-        start_dt = now_local - dt.timedelta(minutes=15)
-        end_dt = now_local + dt.timedelta(minutes=self.poll_interval + 5)
+    async def match_events(self, events: list[CalendarEvent] | None = None) -> bool:
+        """Track events that match state patterns, querying the calendar for the poll window if not already fetched
 
-        events: list[CalendarEvent] = await self.calendar_entity.async_get_events(self.hass, start_dt, end_dt)
+        Returns True if any tracked event was added, updated or removed
+        """
+        changed: bool = False
+        if events is None:
+            start_dt, end_dt = self.poll_window()
+            events = await self.calendar_entity.async_get_events(self.hass, start_dt, end_dt)
 
         for event in events:
             # presume the events are sorted by start time
@@ -383,6 +480,7 @@ class TrackedCalendar:
                         event.summary,
                     )
                     await existing_event.remove()
+                    changed = True
                 else:
                     _LOGGER.debug("AUTOARM Ignoring untracked unmatched event")
             else:
@@ -412,6 +510,8 @@ class TrackedCalendar:
                             hass=self.hass,
                         )
                         await self.tracked_events[event_id].initialize()
+                        self.armer.save_state()
+                        changed = True
                 else:
                     existing_event = self.tracked_events[event_id]
                     if existing_event.event != event:
@@ -422,32 +522,31 @@ class TrackedCalendar:
                             state_str,
                         )
                         await existing_event.update(event)
+                        changed = True
                     else:
                         _LOGGER.debug("AUTOARM No change to previously tracked event")
+        return changed
+
+    async def expire_events(self) -> bool:
+        """Remove past events, serialized with polls since ending an event awaits mid-iteration"""
+        async with self.reconcile_lock:
+            return await self.prune_events()
 
-    async def prune_events(self) -> None:
-        """Remove past events"""
+    async def prune_events(self, live_event_ids: set[str] | None = None) -> bool:
+        """Remove past events, and if the ids of events still in the calendar are known, deleted events
+
+        Returns True if any tracked event was removed
+        """
         to_remove: list[str] = []
-        min_start: dt.datetime | None = None
-        max_end: dt.datetime | None = None
         for event_id, tevent in self.tracked_events.items():
-            if min_start is None or min_start > tevent.event.start_datetime_local:
-                min_start = tevent.event.start_datetime_local
-            if max_end is None or max_end < tevent.event.end_datetime_local:
-                max_end = tevent.event.end_datetime_local
             if not tevent.is_current() and not tevent.is_future():
                 _LOGGER.debug("AUTOARM Pruning expire calendar event: %s", tevent.event.uid)
                 to_remove.append(event_id)
                 await tevent.end(dt_util.now())
-
-        if min_start and max_end:
-            live_event_ids: list[str] = [
-                e.uid for e in await self.calendar_entity.async_get_events(self.hass, min_start, max_end) if e.uid is not None
-            ]
-            for tevent in self.tracked_events.values():
-                if tevent.event.uid not in live_event_ids:
-                    _LOGGER.debug("AUTOARM Pruning dead calendar event: %s", tevent.event.uid)
-                    await tevent.remove()
-                    to_remove.append(tevent.id)
+            elif live_event_ids is not None and event_id not in live_event_ids:
+                _LOGGER.debug("AUTOARM Pruning dead calendar event: %s", tevent.event.uid)
+                await tevent.remove()
+                to_remove.append(event_id)
         for event_id in to_remove:
             del self.tracked_events[event_id]
+        return bool(to_remove)
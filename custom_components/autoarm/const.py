@@ -1,8 +1,11 @@
 """The Auto Arm integration"""
 
 import logging
+from collections.abc import Mapping
 from dataclasses import dataclass
 from enum import StrEnum, auto
+from functools import cached_property
+from types import MappingProxyType
 from typing import Any
 
 import voluptuous as vol
@@ -47,6 +50,8 @@ CONF_SUPERNOTIFY = "supernotify"
 CONF_SCENARIO = "scenario"
 CONF_SOURCE = "source"
 CONF_STATE = "state"
+CONF_DIGEST = "digest"
+CONF_FANOUT = "fanout"
 NOTIFY_COMMON = "common"
 NOTIFY_QUIET = "quiet"
 NOTIFY_NORMAL = "normal"
@@ -61,6 +66,8 @@ NOTIFY_DEF_SCHEMA = vol.Schema({
     vol.Optional(CONF_STATE): vol.All(cv.ensure_list, [vol.In(ALARM_STATES)]),
     vol.Optional(CONF_SCENARIO, default=[]): vol.All(cv.ensure_list, [str]),
     vol.Optional(CONF_DATA): dict,
+    vol.Optional(CONF_DIGEST): vol.All(cv.time_period, cv.positive_timedelta),
+    vol.Optional(CONF_FANOUT): cv.boolean,
 })
 
 
@@ -126,11 +133,21 @@ CONF_CALENDAR_EVENT_STATES = "state_patterns"
 CONF_CALENDAR_NO_EVENT = "no_event_mode"
 CONF_CALENDAR_ENTRY_NOTIFICATIONS = "entry_notifications"
 CONF_CALENDAR_REMINDER_NOTIFICATIONS = "reminders"
+CONF_CALENDAR_TRACKING = "tracking"
+CALENDAR_TRACKING_POLL = "poll"
+CALENDAR_TRACKING_PUSH = "push"
+CALENDAR_TRACKING_OPTIONS = [CALENDAR_TRACKING_POLL, CALENDAR_TRACKING_PUSH]
+# with push tracking, polling is only a safety net for changes that don't alter the calendar entity
+CALENDAR_PUSH_POLL_INTERVAL = 60
+# adaptive polling backs off from the poll interval up to this many minutes when the calendar is empty
+CALENDAR_MAX_POLL_INTERVAL = 240
+CALENDAR_MIN_POLL_INTERVAL = 1
 
 CALENDAR_SCHEMA = vol.Schema({
     vol.Required(CONF_ENTITY_ID): cv.entity_id,
     vol.Optional(CONF_ALIAS): cv.string,
     vol.Optional(CONF_CALENDAR_POLL_INTERVAL, default=15): cv.positive_int,
+    vol.Optional(CONF_CALENDAR_TRACKING, default=CALENDAR_TRACKING_POLL): vol.All(vol.Lower, vol.In(CALENDAR_TRACKING_OPTIONS)),
     # vol.Optional(CONF_CALENDAR_ENTRY_NOTIFICATIONS): vol.In(ENTRY_NOTIFICATION_CHOICES),
     # vol.Optional(CONF_CALENDAR_REMINDER_NOTIFICATIONS, default={}): {
     #     vol.In(ALARM_STATES): vol.All(cv.ensure_list, [cv.time_period])},
@@ -154,13 +171,42 @@ BUTTON_SCHEMA = vol.Schema({
     vol.Required(CONF_ENTITY_ID): vol.All(cv.ensure_list, [cv.entity_id]),
 })
 
+
+class ChangeSource(StrEnum):
+    """Enumeration of all the known ways to trigger a state change"""
+
+    CALENDAR = auto()
+    MOBILE = auto()
+    OCCUPANCY = auto()
+    ALARM_PANEL = auto()
+    BUTTON = auto()
+    ACTION = auto()
+    SUNRISE = auto()
+    SUNSET = auto()
+    ZOMBIFICATION = auto()
+    STARTUP = auto()
+    UNKNOWN = auto()
+
+
 CONF_RATE_LIMIT = "rate_limit"
 CONF_RATE_LIMIT_CALLS = "max_calls"
 CONF_RATE_LIMIT_PERIOD = "period"
-RATE_LIMIT_SCHEMA = vol.Schema({
+CONF_RATE_LIMIT_CALLS_PER_SOURCE = "max_calls_per_source"
+CONF_RATE_LIMIT_SOURCES = "sources"
+CONF_RATE_LIMIT_ENTITIES = "entities"
+RATE_LIMIT_POLICY_SCHEMA = vol.Schema({
     vol.Optional(CONF_RATE_LIMIT_PERIOD, default=60): vol.All(cv.time_period, cv.positive_timedelta),
     vol.Optional(CONF_RATE_LIMIT_CALLS, default=6): cv.positive_int,
 })
+RATE_LIMIT_SCHEMA = RATE_LIMIT_POLICY_SCHEMA.extend({
+    vol.Optional(CONF_RATE_LIMIT_CALLS_PER_SOURCE): cv.positive_int,
+    vol.Optional(CONF_RATE_LIMIT_SOURCES, default={}): vol.Schema({
+        vol.In([s.value for s in ChangeSource]): RATE_LIMIT_POLICY_SCHEMA
+    }),
+    vol.Optional(CONF_RATE_LIMIT_ENTITIES, default={}): vol.Schema({cv.entity_id: RATE_LIMIT_POLICY_SCHEMA}),
+})
+
+CONF_COALESCE_WINDOW = "coalesce_window"
 
 CONF_OCCUPANCY = "occupancy"
 CONF_DAY = "day"
@@ -202,6 +248,7 @@ CONFIG_SCHEMA = vol.Schema(
             vol.Optional(CONF_OCCUPANCY, default={}): OCCUPANCY_SCHEMA,
             vol.Optional(CONF_NOTIFY, default={}): NOTIFY_SCHEMA,
             vol.Optional(CONF_RATE_LIMIT, default={}): RATE_LIMIT_SCHEMA,
+            vol.Optional(CONF_COALESCE_WINDOW, default=0): vol.All(cv.time_period, cv.positive_timedelta),
         })
     },
     extra=vol.ALLOW_EXTRA,  # validation fails without this by trying to include all of HASS config
@@ -235,9 +282,12 @@ DEFAULT_TRANSITIONS: dict[str, str | list[str]] = {
 }
 
 
-@dataclass
+@dataclass(frozen=True)
 class ConditionVariables:
-    """Field with sub-fields added to the template context of Transition Conditions"""
+    """Field with sub-fields added to the template context of Transition Conditions
+
+    Immutable, so the derived fields are computed once and the same context reused for every condition checked
+    """
 
     occupied: bool | None
     unoccupied: bool | None
@@ -249,38 +299,48 @@ class ConditionVariables:
     not_home: list[str] | None = None
 
     def as_dict(self) -> ConfigType:
-        """Generate the field to be exposed in the context, stringifying alarm states"""
+        """Generate the field to be exposed in the context, stringifying alarm states
+
+        The dict is built once and shared, callers must not modify it
+        """
+        return self._fields
+
+    @cached_property
+    def template_context(self) -> Mapping[str, Any]:
+        """Read-only template variables, with the fields under the `autoarm` namespace"""
+        return MappingProxyType({DOMAIN: self._fields})
+
+    @cached_property
+    def decision_key(self) -> tuple[bool | None, bool, str, bool, str, str]:
+        """The finite inputs that the fields are derived from, apart from occupant and calendar event detail"""
+        return (
+            self.occupied,
+            self.night,
+            str(self.state),
+            self.calendar_event is not None,
+            self._fields["occupied_daytime_state"],
+            self._fields["occupied_nighttime_state"],
+        )
+
+    @cached_property
+    def _fields(self) -> ConfigType:
+        night: bool = self.night
+        state: AlarmControlPanelState = self.state
+        manual: bool = state in (AlarmControlPanelState.ARMED_VACATION, AlarmControlPanelState.ARMED_CUSTOM_BYPASS)
         return {
-            "daytime": not self.night,
+            "daytime": not night,
             "occupied": self.occupied,
             "at_home": self.at_home or [],
-            "not_home": self.at_home or [],
-            "vacation": self.state == AlarmControlPanelState.ARMED_VACATION,
-            "night": self.night,
-            "day": not self.night,
-            "bypass": self.state == AlarmControlPanelState.ARMED_CUSTOM_BYPASS,
-            "manual": self.state in (AlarmControlPanelState.ARMED_VACATION, AlarmControlPanelState.ARMED_CUSTOM_BYPASS),
+            "not_home": self.not_home or [],
+            "vacation": state == AlarmControlPanelState.ARMED_VACATION,
+            "night": night,
+            "day": not night,
+            "bypass": state == AlarmControlPanelState.ARMED_CUSTOM_BYPASS,
+            "manual": manual,
             "calendar_event": self.calendar_event,
-            "state": str(self.state),
+            "state": str(state),
             "occupied_daytime_state": str(self.occupied_defaults.get(CONF_DAY, AlarmControlPanelState.DISARMED)),
             "occupied_nighttime_state": str(self.occupied_defaults.get(CONF_NIGHT, AlarmControlPanelState.ARMED_NIGHT)),
-            "disarmed": self.state == AlarmControlPanelState.DISARMED,
-            "computed": not self.calendar_event
-            and self.state not in (AlarmControlPanelState.ARMED_VACATION, AlarmControlPanelState.ARMED_CUSTOM_BYPASS),
+            "disarmed": state == AlarmControlPanelState.DISARMED,
+            "computed": not self.calendar_event and not manual,
         }
-
-
-class ChangeSource(StrEnum):
-    """Enumeration of all the known ways to trigger a state change"""
-
-    CALENDAR = auto()
-    MOBILE = auto()
-    OCCUPANCY = auto()
-    ALARM_PANEL = auto()
-    BUTTON = auto()
-    ACTION = auto()
-    SUNRISE = auto()
-    SUNSET = auto()
-    ZOMBIFICATION = auto()
-    STARTUP = auto()
-    UNKNOWN = auto()
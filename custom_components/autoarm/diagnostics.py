@@ -23,9 +23,15 @@ async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigE
         data["armer"] = {
             "alarm_panel": armer.alarm_panel,
             "calendar_count": len(armer.calendars),
+            "calendars": [calendar.as_dict() for calendar in armer.calendars],
             "occupants": armer.occupants,
             "failures": armer.app_health_tracker.failures,
             "initialization_errors": armer.app_health_tracker.initialization_errors,
+            "notifications": armer.app_health_tracker.notifications,
+            "notification_targets": armer.app_health_tracker.notification_targets,
+            "rate_limit": armer.rate_limiter.as_dict(),
+            "scheduled_jobs": armer.scheduled_jobs.pending(),
+            "scheduled_job_cancellations": armer.scheduled_jobs.cancellations,
         }
 
     return data
@@ -1,14 +1,18 @@
 from __future__ import annotations
 
+import hashlib
+import json
 import logging
-from functools import partial
+from dataclasses import dataclass, field
 from typing import TYPE_CHECKING, Any, cast
 
 from homeassistant.components.alarm_control_panel.const import AlarmControlPanelState
-from homeassistant.exceptions import ConditionError, ConditionErrorContainer
+from homeassistant.const import CONF_CONDITION, CONF_CONDITIONS, CONF_VALUE_TEMPLATE
+from homeassistant.exceptions import ConditionError, ConditionErrorContainer, ConditionErrorMessage, TemplateError
 from homeassistant.helpers import condition as condition_helper
 from homeassistant.helpers import issue_registry as ir
 from homeassistant.helpers.template import Template
+from homeassistant.util.hass_dict import HassKey
 
 from .const import DOMAIN, ConditionVariables
 
@@ -21,6 +25,9 @@ if TYPE_CHECKING:
 
 _LOGGER = logging.getLogger(__name__)
 
+# compiled conditions survive config entry reloads, keyed by content hash
+CONDITION_CACHE_KEY: HassKey[dict[str, CompiledCondition]] = HassKey(f"{DOMAIN}_conditions")
+
 
 class HomeAssistantAPI:
     def __init__(self, hass: HomeAssistant | None = None) -> None:
@@ -51,8 +58,26 @@ class HomeAssistantAPI:
     async def build_condition(
         self, condition_config: list[ConfigType], strict: bool = False, validate: bool = False, name: str = DOMAIN
     ) -> Callable[[TemplateVarsType], bool] | None:
+        compiled: CompiledCondition = await self.compile_condition(condition_config, validate=validate, name=name)
+        if strict:
+            compiled.verify()
+        return compiled.checker
+
+    async def compile_condition(
+        self, condition_config: list[ConfigType], validate: bool = False, name: str = DOMAIN
+    ) -> CompiledCondition:
+        """Validate and build a condition once, returning the checker along with any strict mode errors
+
+        The checker is a normal, non-strict, Home Assistant condition checker. Strict mode is checked by a
+        trial run of the checker, plus rendering template conditions with undefined variables as errors
+        """
         if self._hass is None:
             raise ValueError("HomeAssistant not available")
+        key: str = condition_hash(condition_config, name=name, validate=validate)
+        cache: dict[str, CompiledCondition] = self._hass.data.setdefault(CONDITION_CACHE_KEY, {})
+        if key in cache:
+            _LOGGER.debug("AUTOARM Reusing compiled condition for %s", name)
+            return cache[key]
         capturing_logger: ConditionErrorLoggingAdaptor = ConditionErrorLoggingAdaptor(_LOGGER)
         condition_variables: ConditionVariables = ConditionVariables(None, None, False, AlarmControlPanelState.PENDING, {})
         cond_list: list[ConfigType]
@@ -67,26 +92,31 @@ class HomeAssistantAPI:
             _LOGGER.exception("AUTOARM Condition validation failed")
             raise
         try:
-            if strict:
-                force_strict_template_mode(cond_list, undo=False)
-
             test: Callable[[TemplateVarsType], bool] = await condition_helper.async_conditions_from_config(
                 self._hass, cond_list, cast("logging.Logger", capturing_logger), name
             )
             if test is None:
                 raise ValueError(f"Invalid condition {condition_config}")
-            test({DOMAIN: condition_variables.as_dict()})
-            if strict and capturing_logger.condition_errors:
-                for exception in capturing_logger.condition_errors:
-                    _LOGGER.warning("AUTOARM Invalid condition %s:%s", condition_config, exception)
-                raise capturing_logger.condition_errors[0]
-            return test
+            errors: list[ConditionError] = strict_template_errors(cond_list, condition_variables.template_context)
+            test(condition_variables.template_context)
+            errors.extend(capturing_logger.condition_errors)
+            capturing_logger.condition_errors = []
+            compiled = CompiledCondition(checker=test, config=cond_list, errors=errors, key=key)
+            if not errors:
+                # conditions with errors may depend on entities not yet available, so always rechecked
+                cache[key] = compiled
+            return compiled
         except Exception:
             _LOGGER.exception("AUTOARM Condition eval failed")
             raise
-        finally:
-            if strict:
-                force_strict_template_mode(condition_config, undo=True)
+
+    def prune_condition_cache(self, keep: set[str]) -> None:
+        """Drop compiled conditions no longer used by the current configuration"""
+        if self._hass is None:
+            return
+        cache: dict[str, CompiledCondition] = self._hass.data.get(CONDITION_CACHE_KEY, {})
+        for key in set(cache) - keep:
+            del cache[key]
 
     def evaluate_condition(
         self,
@@ -96,7 +126,7 @@ class HomeAssistantAPI:
         if self._hass is None:
             raise ValueError("HomeAssistant not available")
         try:
-            return checker({DOMAIN: condition_variables.as_dict()} if condition_variables else None)
+            return checker(condition_variables.template_context if condition_variables else None)
         except Exception as e:
             _LOGGER.error("AUTOARM Condition eval failed: %s", e)
             raise
@@ -107,6 +137,23 @@ class HomeAssistantAPI:
             self._hass.bus.async_fire(f"{DOMAIN}_{event_name}", event_data)
 
 
+@dataclass
+class CompiledCondition:
+    """Production condition checker, with the strict mode verdict from the same build"""
+
+    checker: Callable[[TemplateVarsType], bool]
+    config: list[ConfigType]
+    errors: list[ConditionError] = field(default_factory=list)
+    key: str | None = None
+
+    def verify(self) -> None:
+        """Raise the first strict mode error, if any"""
+        if self.errors:
+            for exception in self.errors:
+                _LOGGER.warning("AUTOARM Invalid condition %s:%s", self.config, exception)
+            raise self.errors[0]
+
+
 class ConditionErrorLoggingAdaptor(logging.LoggerAdapter["logging.Logger"]):
     def __init__(self, *args: Any, **kwargs: Any) -> None:
         super().__init__(*args, **kwargs)
@@ -129,28 +176,29 @@ class ConditionErrorLoggingAdaptor(logging.LoggerAdapter["logging.Logger"]):
         self.logger.warning(msg, args, kwargs)
 
 
-def force_strict_template_mode(conditions: list[ConfigType], undo: bool = False) -> None:
-    class TemplateWrapper:
-        def __init__(self, obj: Template) -> None:
-            self._obj = obj
-
-        def __getattr__(self, name: str) -> Any:
-            if name == "async_render_to_info":
-                return partial(self._obj.async_render_to_info, strict=True)
-            return getattr(self._obj, name)
-
-        def __setattr__(self, name: str, value: Any) -> None:
-            super().__setattr__(name, value)
-
-    def wrap_template(cond: ConfigType, undo: bool) -> ConfigType:
-        for key, val in cond.items():
-            if not undo and isinstance(val, Template) and hasattr(val, "_env"):
-                cond[key] = TemplateWrapper(val)
-            elif undo and isinstance(val, TemplateWrapper):
-                cond[key] = val._obj
-            elif isinstance(val, dict):
-                wrap_template(val, undo)
-        return cond
-
-    if conditions is not None:
-        conditions = [wrap_template(condition, undo) for condition in conditions]
+def condition_hash(condition_config: list[ConfigType], name: str = DOMAIN, validate: bool = False) -> str:
+    """Stable hash of a condition config, using the source of any templates"""
+
+    def serialize(value: Any) -> Any:
+        if isinstance(value, Template):
+            return value.template
+        return str(value)
+
+    content: str = json.dumps([name, validate, condition_config], sort_keys=True, default=serialize)
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+def strict_template_errors(conditions: list[ConfigType], variables: TemplateVarsType) -> list[ConditionError]:
+    """Render every template condition, including those nested in and/or/not, failing on undefined variables"""
+    errors: list[ConditionError] = []
+    for condition in conditions:
+        value_template: Any = condition.get(CONF_VALUE_TEMPLATE)
+        if condition.get(CONF_CONDITION) == "template" and isinstance(value_template, Template):
+            try:
+                value_template.async_render(variables, parse_result=False, strict=True)
+            except TemplateError as e:
+                errors.append(ConditionErrorMessage("template", str(e)))
+        nested: Any = condition.get(CONF_CONDITIONS)
+        if isinstance(nested, list):
+            errors.extend(strict_template_errors(nested, variables))
+    return errors
@@ -1,21 +1,31 @@
 import datetime as dt
 import logging
 import re
+import time
+from collections import deque
 from typing import TYPE_CHECKING, Any
 
-import homeassistant.util.dt as dt_util
 from homeassistant.auth import HomeAssistant
 from homeassistant.components.alarm_control_panel.const import AlarmControlPanelState
+from homeassistant.const import STATE_HOME
 from homeassistant.core import State
+from homeassistant.helpers.event import async_track_point_in_time
 from homeassistant.helpers.json import ExtendedJSONEncoder
 
 from .const import DOMAIN, ChangeSource
 
 if TYPE_CHECKING:
-    from collections.abc import Callable
+    from collections.abc import Callable, Coroutine
 
 _LOGGER = logging.getLogger(__name__)
 
+NOTIFY_SENT = "sent"
+NOTIFY_FAILED = "failed"
+NOTIFY_TIMEOUT = "timeout"
+NOTIFY_DROPPED = "dropped"
+NOTIFY_DIGESTED = "digested"
+NOTIFY_PARTIAL = "partial"
+
 
 def alarm_state_as_enum(state_str: str | None) -> AlarmControlPanelState | None:
     if state_str is None:
@@ -45,32 +55,247 @@ def safe_state(state: State | None) -> str | None:
         return None
 
 
+class OccupancyIndex:
+    """Home and away membership of occupant entities, kept current from state change events
+
+    A state set with `hass.states.async_set` is only reflected once its state change event has been
+    dispatched, on the next pass of the event loop, not as soon as the state machine is updated
+    """
+
+    def __init__(self, entity_ids: list[str]) -> None:
+        self.entity_ids: list[str] = entity_ids
+        self.home: set[str] = set()
+        self.away: set[str] = set(entity_ids)
+        self._at_home: list[str] | None = None
+        self._not_home: list[str] | None = None
+
+    def rebuild(self, hass: HomeAssistant) -> None:
+        """Seed membership from the state machine, only needed at startup"""
+        for entity_id in self.entity_ids:
+            self.update(entity_id, safe_state(hass.states.get(entity_id)))
+
+    def update(self, entity_id: str | None, state: str | None) -> bool:
+        """Apply an occupant state change, returning True if home membership changed"""
+        if entity_id is None or (entity_id not in self.home and entity_id not in self.away):
+            return False
+        if state == STATE_HOME:
+            if entity_id in self.home:
+                return False
+            self.away.discard(entity_id)
+            self.home.add(entity_id)
+        else:
+            if entity_id in self.away:
+                return False
+            self.home.discard(entity_id)
+            self.away.add(entity_id)
+        self._at_home = self._not_home = None
+        return True
+
+    @property
+    def home_count(self) -> int:
+        return len(self.home)
+
+    def is_occupied(self) -> bool | None:
+        return bool(self.home) if self.entity_ids else None
+
+    def is_unoccupied(self) -> bool | None:
+        return not self.home if self.entity_ids else None
+
+    def at_home(self) -> list[str] | None:
+        if not self.entity_ids:
+            return None
+        if self._at_home is None:
+            self._at_home = [e for e in self.entity_ids if e in self.home]
+        return self._at_home
+
+    def not_home(self) -> list[str] | None:
+        if not self.entity_ids:
+            return None
+        if self._not_home is None:
+            self._not_home = [e for e in self.entity_ids if e in self.away]
+        return self._not_home
+
+
 class Limiter:
-    """Rate limiting tracker"""
+    """Sliding window rate limiter, with an optional separate budget for each change source
+
+    Calls are held as monotonic timestamps, oldest first, so expiry only ever pops from the left,
+    and rejected calls aren't recorded
+    """
 
-    def __init__(self, window: dt.timedelta, max_calls: int = 4) -> None:
-        self.calls: list[dt.datetime] = []
+    def __init__(self, window: dt.timedelta, max_calls: int = 4, max_calls_per_source: int | None = None) -> None:
+        self.calls: deque[float] = deque()
+        self.source_calls: dict[str, deque[float]] = {}
         self.window: dt.timedelta = window
+        self.period: float = window.total_seconds()
         self.max_calls: int = max_calls
+        self.max_calls_per_source: int | None = max_calls_per_source
         _LOGGER.debug(
-            "AUTOARM Rate limiter initialized with window %s and max_calls %s",
+            "AUTOARM Rate limiter initialized with window %s, max_calls %s and max_calls_per_source %s",
             window,
             max_calls,
+            max_calls_per_source,
         )
 
-    def triggered(self) -> bool:
+    def in_window(self, source: str | None = None, now: float | None = None) -> list[tuple[deque[float], int]]:
+        """Unexpired calls and budget for the overall limit, and for the source if it has its own budget"""
+        now = time.monotonic() if now is None else now
+        budgets: list[tuple[deque[float], int]] = [(self.calls, self.max_calls)]
+        if source is not None and self.max_calls_per_source is not None:
+            budgets.append((self.source_calls.setdefault(source, deque()), self.max_calls_per_source))
+        cut_off: float = now - self.period
+        for calls, _max_calls in budgets:
+            while calls and calls[0] < cut_off:
+                calls.popleft()
+        return budgets
+
+    def exhausted(self, source: str | None = None, now: float | None = None) -> bool:
+        """Check if another call would exceed the budget, without registering it"""
+        return any(len(calls) >= max_calls for calls, max_calls in self.in_window(source, now))
+
+    def record(self, source: str | None = None, now: float | None = None) -> None:
+        now = time.monotonic() if now is None else now
+        for calls, _max_calls in self.in_window(source, now):
+            calls.append(now)
+
+    def triggered(self, source: str | None = None) -> bool:
         """Register a call and check if window based rate limit triggered"""
-        cut_off: dt.datetime = dt_util.now() - self.window
-        self.calls.append(dt_util.now())
-        in_scope = 0
+        now: float = time.monotonic()
+        if self.exhausted(source, now):
+            return True
+        self.record(source, now)
+        return False
+
+    def remaining(self, source: str | None = None) -> int:
+        """Calls still allowed in the current window"""
+        return min(max_calls - len(calls) for calls, max_calls in self.in_window(source))
+
+    def reset_in(self, source: str | None = None) -> float:
+        """Seconds until another call would be allowed, zero if allowed now"""
+        now: float = time.monotonic()
+        return max(
+            (calls[0] + self.period - now for calls, max_calls in self.in_window(source, now) if len(calls) >= max_calls),
+            default=0.0,
+        )
+
+
+class LimiterRegistry:
+    """Rate limiters applied to each arm request, overall and for any configured source or entity
+
+    A call is only registered when every applicable limiter allows it, so one rejection doesn't
+    use up the budget of the others
+    """
 
-        for call in self.calls[:]:
-            if call >= cut_off:
-                in_scope += 1
-            else:
-                self.calls.remove(call)
+    def __init__(
+        self, overall: Limiter, sources: dict[str, Limiter] | None = None, entities: dict[str, Limiter] | None = None
+    ) -> None:
+        self.overall: Limiter = overall
+        self.sources: dict[str, Limiter] = sources or {}
+        self.entities: dict[str, Limiter] = entities or {}
 
-        return in_scope > self.max_calls
+    def applicable(self, source: str | None = None, *entity_ids: str) -> list[tuple[str, Limiter]]:
+        limiters: list[tuple[str, Limiter]] = [
+            (f"entity:{entity_id}", self.entities[entity_id]) for entity_id in entity_ids if entity_id in self.entities
+        ]
+        if source is not None and source in self.sources:
+            limiters.append((f"source:{source}", self.sources[source]))
+        limiters.append(("overall", self.overall))
+        return limiters
+
+    def rejected_by(self, source: str | None = None, *entity_ids: str) -> str | None:
+        """Name of the first limiter to reject the call, otherwise None and the call is registered with all of them"""
+        now: float = time.monotonic()
+        limiters: list[tuple[str, Limiter]] = self.applicable(source, *entity_ids)
+        for name, limiter in limiters:
+            # the overall limiter also applies any max_calls_per_source budget
+            limiter_source: str | None = source if limiter is self.overall else None
+            if limiter.exhausted(limiter_source, now):
+                if limiter is self.overall and not limiter.exhausted(None, now):
+                    return f"overall:{source}"
+                return name
+        for _name, limiter in limiters:
+            limiter.record(source if limiter is self.overall else None, now)
+        return None
+
+    def remaining(self, source: str | None = None, *entity_ids: str) -> int:
+        return min(
+            limiter.remaining(source if limiter is self.overall else None)
+            for _name, limiter in self.applicable(source, *entity_ids)
+        )
+
+    def reset_in(self, source: str | None = None, *entity_ids: str) -> float:
+        return max(
+            limiter.reset_in(source if limiter is self.overall else None)
+            for _name, limiter in self.applicable(source, *entity_ids)
+        )
+
+    def as_dict(self) -> dict[str, dict[str, Any]]:
+        limiters: list[tuple[str, Limiter]] = [
+            ("overall", self.overall),
+            *((f"source:{source}", limiter) for source, limiter in self.sources.items()),
+            *((f"entity:{entity_id}", limiter) for entity_id, limiter in self.entities.items()),
+        ]
+        return {name: {"remaining": limiter.remaining(), "reset_in": limiter.reset_in()} for name, limiter in limiters}
+
+
+class ScheduledJobs:
+    """Pending point in time jobs by id, each removed from the registry as it fires or is cancelled
+
+    Scheduling with the id of a job still pending replaces it, and pending jobs cancelled or replaced
+    are counted by id
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self.hass: HomeAssistant = hass
+        self.jobs: dict[str, tuple[dt.datetime, Callable[[], None]]] = {}
+        self.cancellations: dict[str, int] = {}
+        self.sequence: int = 0
+
+    def __len__(self) -> int:
+        return len(self.jobs)
+
+    def __contains__(self, job_id: str) -> bool:
+        return job_id in self.jobs
+
+    def schedule(
+        self,
+        trigger_time: dt.datetime,
+        action: "Callable[[dt.datetime], Coroutine[Any, Any, None] | None]",
+        job_id: str | None = None,
+    ) -> str:
+        if job_id is None:
+            self.sequence += 1
+            job_id = f"job_{self.sequence}"
+        elif self.cancel(job_id):
+            _LOGGER.debug("AUTOARM Replacing pending job %s", job_id)
+
+        async def fire(now: dt.datetime) -> None:
+            if self.jobs.get(job_id, (None, None))[1] is unsub:
+                del self.jobs[job_id]
+            result = action(now)
+            if result is not None:
+                await result
+
+        unsub: Callable[[], None] = async_track_point_in_time(self.hass, fire, trigger_time)
+        self.jobs[job_id] = (trigger_time, unsub)
+        return job_id
+
+    def cancel(self, job_id: str) -> bool:
+        job: tuple[dt.datetime, Callable[[], None]] | None = self.jobs.pop(job_id, None)
+        if job is None:
+            return False
+        job[1]()
+        self.cancellations.setdefault(job_id, 0)
+        self.cancellations[job_id] += 1
+        return True
+
+    def cancel_all(self) -> None:
+        while self.jobs:
+            _job_id, (_trigger_time, unsub) = self.jobs.popitem()
+            unsub()
+
+    def pending(self) -> dict[str, str]:
+        return {job_id: trigger_time.isoformat() for job_id, (trigger_time, _unsub) in self.jobs.items()}
 
 
 def deobjectify(obj: object) -> dict[Any, Any] | str | int | float | bool | None:
@@ -88,6 +313,8 @@ class AppHealthTracker:
     def __init__(self, hass: HomeAssistant) -> None:
         self.hass = hass
         self.initialization_errors: dict[str, int] = {}
+        self.notifications: dict[str, int] = {}
+        self.notification_targets: dict[str, dict[str, Any]] = {}
         self.failures = 0
 
     def app_initialized(self) -> None:
@@ -110,6 +337,20 @@ class AppHealthTracker:
         self.failures += 1
         self.hass.states.async_set(f"sensor.{DOMAIN}_failures", str(self.failures))
 
+    def record_notification(self, outcome: str) -> None:
+        """Count notification outcomes, anything other than `sent` or `digested` is also a runtime failure"""
+        self.notifications.setdefault(outcome, 0)
+        self.notifications[outcome] += 1
+        if outcome not in (NOTIFY_SENT, NOTIFY_DIGESTED):
+            self.record_runtime_error()
+
+    def record_notification_target(self, target: str, outcome: str, latency: float) -> None:
+        """Count outcomes for a single fan-out target, with the latency of its most recent call"""
+        stats: dict[str, Any] = self.notification_targets.setdefault(target, {})
+        stats.setdefault(outcome, 0)
+        stats[outcome] += 1
+        stats["last_latency"] = round(latency, 3)
+
 
 class ExtendedExtendedJSONEncoder(ExtendedJSONEncoder):
     def default(self, o: Any) -> Any:
@@ -1,15 +1,67 @@
+import asyncio
+import datetime as dt
+import itertools
 import logging
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from functools import partial
 from typing import Any
 
 from homeassistant.components.alarm_control_panel.const import AlarmControlPanelState
 from homeassistant.const import CONF_SERVICE, CONF_SOURCE, CONF_STATE, CONF_TARGET
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers.event import async_call_later
 
-from custom_components.autoarm.const import ALARM_STATES, CONF_SCENARIO, CONF_SUPERNOTIFY, NOTIFY_COMMON, ChangeSource
-from custom_components.autoarm.helpers import AppHealthTracker
+from custom_components.autoarm.const import (
+    ALARM_STATES,
+    CONF_DIGEST,
+    CONF_FANOUT,
+    CONF_SCENARIO,
+    CONF_SUPERNOTIFY,
+    DOMAIN,
+    NOTIFY_COMMON,
+    ChangeSource,
+)
+from custom_components.autoarm.helpers import (
+    NOTIFY_DIGESTED,
+    NOTIFY_DROPPED,
+    NOTIFY_FAILED,
+    NOTIFY_PARTIAL,
+    NOTIFY_SENT,
+    NOTIFY_TIMEOUT,
+    AppHealthTracker,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
+NOTIFY_QUEUE_SIZE = 20
+NOTIFY_TIMEOUT_SECONDS = 15.0
+NOTIFY_TARGET_TIMEOUT_SECONDS = 10.0
+
+
+@dataclass(frozen=True)
+class NotifyRoute:
+    """Profile selected for a source and state change, merged with the common profile"""
+
+    rank: int
+    profile_name: str
+    data: dict[str, Any] = field(default_factory=dict)
+    action: str | None = None
+    targets: list[str] | None = None
+    digest: dt.timedelta | None = None
+    fanout: bool = False
+
+
+@dataclass
+class Digest:
+    """State changes buffered for a profile, and so for its targets, until the digest window closes"""
+
+    route: NotifyRoute
+    changes: list[tuple[str, str]] = field(default_factory=list)
+    sources: list[ChangeSource] = field(default_factory=list)
+    unsub: Callable[[], None] | None = None
+
 
 class Notifier:
     def __init__(
@@ -25,6 +77,118 @@ class Notifier:
         self.app_health_tracker: AppHealthTracker = app_health_tracker
         self.notify_action: str | None = notify_action
         self.notify_targets: list[str] = notify_targets or []
+        self.queue: asyncio.Queue[dict[str, Any]] = asyncio.Queue(maxsize=NOTIFY_QUEUE_SIZE)
+        self.dispatcher: asyncio.Task[None] | None = None
+        self.timeout: float = NOTIFY_TIMEOUT_SECONDS
+        self.target_timeout: float = NOTIFY_TARGET_TIMEOUT_SECONDS
+        self.digests: dict[str, Digest] = {}
+        self.ranked_routes: list[tuple[dict[str, Any], NotifyRoute]] = []
+        self.routes: dict[tuple[str, str | None, str | None], NotifyRoute | None] = {}
+        self.compile_routes()
+
+    def compile_routes(self) -> None:
+        """Select the profile for every known source and state change, with the common profile pre-merged
+
+        Profiles are tried most specific first, by number of states, so the first match wins
+        """
+        ranked: list[str] = sorted(
+            (name for name in self.notify_profiles if name != NOTIFY_COMMON),
+            key=lambda v: len(self.notify_profiles[v].get(CONF_STATE, ALARM_STATES)),
+        )
+        self.ranked_routes = [(self.notify_profiles[name], self.merge_profile(rank, name)) for rank, name in enumerate(ranked)]
+        self.routes = {}
+        for source, from_state, to_state in itertools.product(ChangeSource, (None, *ALARM_STATES), (None, *ALARM_STATES)):
+            self.route(source, from_state, to_state)
+        _LOGGER.debug(
+            "AUTOARM Notification routing compiled for %s profiles, %s routes", len(self.ranked_routes), len(self.routes)
+        )
+
+    def merge_profile(self, rank: int, profile_name: str) -> NotifyRoute:
+        # separately merge base dict and data sub-dict as cheap and nasty semi-deep-merge
+        base_profile: dict[str, Any] = self.notify_profiles.get(NOTIFY_COMMON, {})
+        selected_profile: dict[str, Any] = self.notify_profiles[profile_name]
+        merged_profile: dict[str, Any] = dict(base_profile)
+        merged_profile.update(selected_profile)
+        data: dict[str, Any] = dict(base_profile.get("data", {}))
+        data.update(selected_profile.get("data", {}))
+        if "profile" in data and data["profile"] is None:
+            data["profile"] = profile_name
+        if merged_profile.get(CONF_SUPERNOTIFY) and merged_profile.get(CONF_SCENARIO):
+            data["apply_scenarios"] = merged_profile.get(CONF_SCENARIO)
+        return NotifyRoute(
+            rank=rank,
+            profile_name=profile_name,
+            data=data,
+            action=merged_profile.get(CONF_SERVICE, self.notify_action),
+            targets=merged_profile.get(CONF_TARGET, self.notify_targets),
+            digest=merged_profile.get(CONF_DIGEST),
+            fanout=bool(merged_profile.get(CONF_FANOUT)),
+        )
+
+    def route(self, source: str, from_state: str | None, to_state: str | None) -> NotifyRoute | None:
+        """Profile for a single source and state change, selecting and remembering any not compiled"""
+        key = (source, from_state, to_state)
+        if key in self.routes:
+            return self.routes[key]
+        selected: NotifyRoute | None = None
+        for profile, candidate in self.ranked_routes:
+            if profile.get(CONF_SOURCE) and source not in profile.get(CONF_SOURCE, []):
+                continue
+            only_for_states: list[str] | None = profile.get(CONF_STATE)
+            if only_for_states and from_state not in only_for_states and to_state not in only_for_states:
+                continue
+            selected = candidate
+            break
+        self.routes[key] = selected
+        return selected
+
+    def enqueue(
+        self,
+        source: ChangeSource,
+        from_state: AlarmControlPanelState | None = None,
+        to_state: AlarmControlPanelState | None = None,
+        message: str | None = None,
+        title: str | None = None,
+        coalesced_sources: list[ChangeSource] | None = None,
+    ) -> None:
+        """Queue a notification for the background dispatcher, so callers never wait on notify actions"""
+        try:
+            self.queue.put_nowait({
+                "source": source,
+                "from_state": from_state,
+                "to_state": to_state,
+                "message": message,
+                "title": title,
+                "coalesced_sources": coalesced_sources,
+            })
+        except asyncio.QueueFull:
+            _LOGGER.warning("AUTOARM Notification queue full, dropping %s notification", source)
+            self.app_health_tracker.record_notification(NOTIFY_DROPPED)
+            return
+        if self.dispatcher is None or self.dispatcher.done():
+            self.dispatcher = self.hass.async_create_task(self.dispatch(), name=f"{DOMAIN}_notifier", eager_start=False)
+
+    async def dispatch(self) -> None:
+        """Send queued notifications in order, each bounded by the timeout, until the queue is empty"""
+        while not self.queue.empty():
+            request: dict[str, Any] = self.queue.get_nowait()
+            try:
+                async with asyncio.timeout(self.timeout):
+                    await self.notify(**request)
+            except TimeoutError:
+                _LOGGER.warning("AUTOARM Notification for %s timed out after %ss", request["source"], self.timeout)
+                self.app_health_tracker.record_notification(NOTIFY_TIMEOUT)
+
+    def shutdown(self) -> None:
+        for digest in self.digests.values():
+            if digest.unsub is not None:
+                digest.unsub()
+        self.digests = {}
+        if self.dispatcher is not None and not self.dispatcher.done():
+            self.dispatcher.cancel()
+        self.dispatcher = None
+        while not self.queue.empty():
+            self.queue.get_nowait()
 
     async def notify(
         self,
@@ -33,89 +197,140 @@ class Notifier:
         to_state: AlarmControlPanelState | None = None,
         message: str | None = None,
         title: str | None = None,
+        coalesced_sources: list[ChangeSource] | None = None,
     ) -> None:
 
-        try:
-            selected_profile: dict[str, Any] | None = None
-            selected_profile_name: str | None = None
-            config_by_state_pickiness = sorted(
-                self.notify_profiles, key=lambda v: len(self.notify_profiles[v].get(CONF_STATE, ALARM_STATES))
-            )
-            for profile_name in config_by_state_pickiness:
-                if profile_name == NOTIFY_COMMON:
-                    continue
-                profile: dict[str, Any] = self.notify_profiles[profile_name]
-                if profile.get(CONF_SOURCE) and source not in profile.get(CONF_SOURCE, []):
-                    _LOGGER.debug(
-                        "AUTOARM Notification not selected for %s profile for source match on %s", profile_name, source
-                    )
-                    continue
-                only_for_states: list[AlarmControlPanelState] | None = profile.get(CONF_STATE)
-                if only_for_states and from_state not in only_for_states and to_state not in only_for_states:
-                    _LOGGER.debug(
-                        "AUTOARM Notification not selected for %s profile for state match on %s->%s",
-                        profile_name,
-                        from_state,
-                        to_state,
-                    )
-                    continue
-                selected_profile = profile
-                selected_profile_name = profile_name
-                break
-            if selected_profile is None:
-                _LOGGER.debug("AUTOARM No profile selected for %s notification: %s", source, message)
+        # a coalesced reset matches profiles for any of its merged sources
+        sources: list[ChangeSource] = coalesced_sources or [source]
+        route: NotifyRoute | None = min(
+            (r for r in (self.route(s, from_state, to_state) for s in sources) if r is not None),
+            key=lambda r: r.rank,
+            default=None,
+        )
+        if route is None:
+            _LOGGER.debug("AUTOARM No profile selected for %s notification: %s", source, message)
+            return
+
+        if route.digest and message is None and from_state and to_state:
+            if ChangeSource.ALARM_PANEL not in sources and AlarmControlPanelState.TRIGGERED not in (from_state, to_state):
+                self.buffer_digest(route, route.digest, sources, from_state, to_state)
                 return
+        pending: Digest | None = self.digests.pop(route.profile_name, None)
+        if pending is not None:
+            # send what was buffered first, so immediate changes arrive in order
+            await self.send_digest(pending)
+
+        if title is None:
+            title = f"Alarm now {to_state}" if to_state else "Alarm Panel Change"
+        if message is None:
+            if from_state and to_state:
+                changed_by: str = ", ".join(s.capitalize() for s in sources)
+                message = f"Alarm state changed from {from_state} to {to_state} by {changed_by}"
+            else:
+                message = "Alarm control panel operation complete"
+        await self.send(route, source, message, title)
+
+    def buffer_digest(
+        self, route: NotifyRoute, window: dt.timedelta, sources: list[ChangeSource], from_state: str, to_state: str
+    ) -> None:
+        """Hold a state change for the profile's digest window, opening the window on the first change"""
+        digest: Digest | None = self.digests.get(route.profile_name)
+        if digest is None:
+            digest = self.digests[route.profile_name] = Digest(route)
+            digest.unsub = async_call_later(self.hass, window, partial(self.on_digest_window, route.profile_name))
+            _LOGGER.debug("AUTOARM Digesting %s notifications for %s", route.profile_name, window)
+        digest.changes.append((from_state, to_state))
+        digest.sources.extend(s for s in sources if s not in digest.sources)
+        self.app_health_tracker.record_notification(NOTIFY_DIGESTED)
+
+    async def on_digest_window(self, profile_name: str, _now: dt.datetime) -> None:
+        digest: Digest | None = self.digests.pop(profile_name, None)
+        if digest is not None:
+            digest.unsub = None
+            await self.send_digest(digest)
 
-            # separately merge base dict and data sub-dict as cheap and nasty semi-deep-merge
-            base_profile = self.notify_profiles.get(NOTIFY_COMMON, {})
-            base_profile_data = base_profile.get("data", {})
-            merged_profile = dict(base_profile)
-            merged_profile_data = dict(base_profile_data)
-            if selected_profile is not None:
-                selected_profile_data: dict[str, Any] = selected_profile.get("data", {})
-                merged_profile.update(selected_profile)
-                merged_profile_data.update(selected_profile_data)
-            merged_profile["data"] = merged_profile_data
-
-            data = merged_profile.get("data", {})
+    async def send_digest(self, digest: Digest) -> None:
+        """Send one message summarising the chain of state changes and all their sources"""
+        if digest.unsub is not None:
+            digest.unsub()
+            digest.unsub = None
+        from_state: str = digest.changes[0][0]
+        to_state: str = digest.changes[-1][1]
+        changed_by: str = ", ".join(s.capitalize() for s in digest.sources)
+        if len(digest.changes) == 1:
+            message = f"Alarm state changed from {from_state} to {to_state} by {changed_by}"
+        else:
+            chain: str = " → ".join([from_state, *(change[1] for change in digest.changes)])
+            message = f"Alarm state changed {chain} by {changed_by}"
+        await self.send(digest.route, digest.sources[-1], message, f"Alarm now {to_state}")
+
+    async def send(self, route: NotifyRoute, source: ChangeSource, message: str, title: str) -> None:
+        try:
+            data: dict[str, Any] = dict(route.data)
             if "source" in data and data["source"] is None:
                 data["source"] = str(source)
-            if "profile" in data and data["profile"] is None:
-                data["profile"] = selected_profile_name
-            if merged_profile.get(CONF_SUPERNOTIFY) and merged_profile.get(CONF_SCENARIO):
-                data["apply_scenarios"] = merged_profile.get(CONF_SCENARIO)
-
-            notify_action: str | None = merged_profile.get(CONF_SERVICE, self.notify_action)
-            notify_targets: list[str] | None = merged_profile.get(CONF_TARGET, self.notify_targets)
-            if notify_action is None:
+
+            if not route.action:
                 _LOGGER.debug("AUTOARM Notifications disabled, no notification action")
                 return
-            if notify_action == "notify.send_message" and not notify_targets:
+            if route.action == "notify.send_message" and not route.targets:
                 _LOGGER.debug("AUTOARM Notifications disabled, no targets for notify.send_message")
                 return
 
-            if title is None:
-                title = f"Alarm now {to_state}" if to_state else "Alarm Panel Change"
-            if message is None:
-                if from_state and to_state:
-                    message = f"Alarm state changed from {from_state} to {to_state} by {source.capitalize()}"
-                else:
-                    message = "Alarm control panel operation complete"
-
-            if notify_action and merged_profile:
-                service_data: dict[str, Any] = {"message": message, "title": title, "data": data}
-                if notify_targets:
-                    service_data["target"] = notify_targets
-                domain, action = notify_action.split(".", 1)
-                _LOGGER.debug("AUTOARM Notifying %s.%s with %s", domain, action, service_data)
-                await self.hass.services.async_call(
-                    domain,
-                    action,
-                    service_data=service_data,
-                )
-            else:
-                _LOGGER.debug("AUTOARM Skipped notification, service: %s, data: %s", self.notify_action, merged_profile)
+            service_data: dict[str, Any] = {"message": message, "title": title, "data": data}
+            if route.fanout and route.targets:
+                await self.fan_out(route.action, route.targets, service_data)
+                return
+            if route.targets:
+                service_data["target"] = route.targets
+            domain, action = route.action.split(".", 1)
+            _LOGGER.debug("AUTOARM Notifying %s.%s with %s", domain, action, service_data)
+            # blocking, so the dispatcher timeout and the recorded outcome cover delivery, not just scheduling
+            await self.hass.services.async_call(
+                domain,
+                action,
+                service_data=service_data,
+                blocking=True,
+            )
+            self.app_health_tracker.record_notification(NOTIFY_SENT)
 
         except Exception:
-            self.app_health_tracker.record_runtime_error()
-            _LOGGER.exception("AUTOARM %s failed", self.notify_action)
+            self.app_health_tracker.record_notification(NOTIFY_FAILED)
+            _LOGGER.exception("AUTOARM %s failed", route.action)
+
+    async def fan_out(self, notify_action: str, targets: list[str], service_data: dict[str, Any]) -> None:
+        """Call each target concurrently, so one slow or dead target can't hold up the others
+
+        A target that is itself a notify action, e.g. `notify.mobile_app_phone`, is called directly.
+        If only some targets fail, the send is recorded as `partial`, so a dead device still counts as a failure
+        """
+        results: list[bool] = await asyncio.gather(
+            *(self.send_to_target(notify_action, target, service_data) for target in targets)
+        )
+        if all(results):
+            self.app_health_tracker.record_notification(NOTIFY_SENT)
+        elif any(results):
+            self.app_health_tracker.record_notification(NOTIFY_PARTIAL)
+        else:
+            self.app_health_tracker.record_notification(NOTIFY_FAILED)
+
+    async def send_to_target(self, notify_action: str, target: str, service_data: dict[str, Any]) -> bool:
+        target_data: dict[str, Any] = dict(service_data)
+        if target.startswith("notify."):
+            notify_action = target
+        else:
+            target_data["target"] = [target]
+        domain, action = notify_action.split(".", 1)
+        started: float = time.monotonic()
+        outcome: str = NOTIFY_SENT
+        try:
+            async with asyncio.timeout(self.target_timeout):
+                await self.hass.services.async_call(domain, action, service_data=target_data, blocking=True)
+        except TimeoutError:
+            _LOGGER.warning("AUTOARM Notification to %s timed out after %ss", target, self.target_timeout)
+            outcome = NOTIFY_TIMEOUT
+        except Exception as e:
+            _LOGGER.warning("AUTOARM Notification to %s failed: %s", target, e)
+            outcome = NOTIFY_FAILED
+        self.app_health_tracker.record_notification_target(target, outcome, time.monotonic() - started)
+        return outcome == NOTIFY_SENT
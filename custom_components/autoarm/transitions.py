@@ -0,0 +1,231 @@
+"""Native evaluation of transition conditions that are pure boolean expressions over `autoarm.*` variables"""
+
+import datetime as dt
+import itertools
+import logging
+from collections.abc import Callable, Mapping
+from typing import Any
+
+from homeassistant.components.alarm_control_panel.const import AlarmControlPanelState
+from homeassistant.components.calendar import CalendarEvent
+from homeassistant.const import CONF_CONDITION, CONF_CONDITIONS, CONF_VALUE_TEMPLATE
+from homeassistant.helpers.template import Template
+from homeassistant.helpers.typing import ConfigType, TemplateVarsType
+from jinja2 import Environment, nodes
+from jinja2.exceptions import TemplateSyntaxError
+
+from .const import DOMAIN, ConditionVariables
+
+_LOGGER = logging.getLogger(__name__)
+
+Predicate = Callable[[Mapping[str, Any]], Any]
+ConditionCheckerType = Callable[[TemplateVarsType], bool]
+
+# fields exposed by ConditionVariables, the only names a native expression may reference
+NATIVE_FIELDS: frozenset[str] = frozenset(ConditionVariables(None, None, False, AlarmControlPanelState.PENDING, {}).as_dict())
+COMPARISONS: dict[str, Callable[[Any, Any], bool]] = {"eq": lambda a, b: a == b, "ne": lambda a, b: a != b}
+
+# occupant lists are open-ended, so can't be enumerated
+TABLE_FIELDS: frozenset[str] = NATIVE_FIELDS - {"at_home", "not_home"}
+TABLE_CALENDAR_EVENT: CalendarEvent = CalendarEvent(
+    start=dt.datetime.min.replace(tzinfo=dt.UTC), end=dt.datetime.max.replace(tzinfo=dt.UTC), summary=DOMAIN
+)
+
+_parser: Environment = Environment()
+
+
+class NativeCondition:
+    """Transition condition checker that evaluates Python predicates instead of rendering templates
+
+    Called with the same variables as a Home Assistant condition checker, and falls back to the
+    Home Assistant checker when the `autoarm` variables aren't present
+    """
+
+    def __init__(
+        self,
+        predicate: Callable[[Mapping[str, Any]], bool],
+        fallback: ConditionCheckerType,
+        fields: frozenset[str] = NATIVE_FIELDS,
+    ) -> None:
+        self.predicate = predicate
+        self.fallback = fallback
+        self.fields = fields
+
+    def __call__(self, variables: TemplateVarsType = None) -> bool:
+        fields: Mapping[str, Any] | None = variables.get(DOMAIN) if variables else None
+        if fields is None:
+            return self.fallback(variables)
+        return self.predicate(fields)
+
+
+def rendered_true(value: Any) -> bool:
+    """Home Assistant template conditions are true only when the stripped render is `true`"""
+    return str(value).strip().lower() == "true"
+
+
+def compile_conditions(
+    condition_config: list[ConfigType], referenced: set[str] | None = None
+) -> Callable[[Mapping[str, Any]], bool] | None:
+    """Compile a validated condition list, or None if any part isn't a recognised pure boolean shape
+
+    Names of the `autoarm` fields used are added to `referenced`, if provided
+    """
+    referenced = referenced if referenced is not None else set()
+    predicates: list[Callable[[Mapping[str, Any]], bool]] = []
+    for config in condition_config:
+        predicate = compile_condition(config, referenced)
+        if predicate is None:
+            return None
+        predicates.append(predicate)
+    if len(predicates) == 1:
+        return predicates[0]
+    return lambda fields: all(predicate(fields) for predicate in predicates)
+
+
+def compile_condition(config: ConfigType, referenced: set[str]) -> Callable[[Mapping[str, Any]], bool] | None:
+    condition_type = config.get(CONF_CONDITION)
+    if condition_type == "template" and set(config) == {CONF_CONDITION, CONF_VALUE_TEMPLATE}:
+        template: Any = config[CONF_VALUE_TEMPLATE]
+        if not isinstance(template, Template):
+            return None
+        return compile_template(template.template, referenced)
+    if condition_type in ("and", "or", "not") and set(config) == {CONF_CONDITION, CONF_CONDITIONS}:
+        predicates: list[Callable[[Mapping[str, Any]], bool]] = []
+        for sub_config in config[CONF_CONDITIONS]:
+            predicate = compile_condition(sub_config, referenced)
+            if predicate is None:
+                return None
+            predicates.append(predicate)
+        if condition_type == "and":
+            return lambda fields: all(predicate(fields) for predicate in predicates)
+        if condition_type == "or":
+            return lambda fields: any(predicate(fields) for predicate in predicates)
+        return lambda fields: not any(predicate(fields) for predicate in predicates)
+    return None
+
+
+def compile_template(source: str, referenced: set[str]) -> Callable[[Mapping[str, Any]], bool] | None:
+    """Compile a template that is a single expression, with optional surrounding whitespace"""
+    try:
+        parsed: nodes.Template = _parser.parse(source)
+    except TemplateSyntaxError:
+        return None
+    if len(parsed.body) != 1 or not isinstance(parsed.body[0], nodes.Output):
+        return None
+    expressions: list[nodes.Node] = [
+        node for node in parsed.body[0].nodes if not (isinstance(node, nodes.TemplateData) and not node.data.strip())
+    ]
+    if len(expressions) != 1:
+        return None
+    expression: Predicate | None = compile_expression(expressions[0], referenced)
+    if expression is None:
+        return None
+    return lambda fields: rendered_true(expression(fields))
+
+
+def compile_expression(node: nodes.Node, referenced: set[str]) -> Predicate | None:
+    """Compile a Jinja expression node, following Jinja's Python semantics for `and`, `or` and `not`"""
+    if isinstance(node, nodes.Const) and isinstance(node.value, (str, bool, int, float, type(None))):
+        value: Any = node.value
+        return lambda _fields: value
+    if isinstance(node, nodes.Getattr):
+        if isinstance(node.node, nodes.Name) and node.node.name == DOMAIN and node.attr in NATIVE_FIELDS:
+            attr: str = node.attr
+            referenced.add(attr)
+            return lambda fields: fields[attr]
+        return None
+    if isinstance(node, (nodes.And, nodes.Or)):
+        left: Predicate | None = compile_expression(node.left, referenced)
+        right: Predicate | None = compile_expression(node.right, referenced)
+        if left is None or right is None:
+            return None
+        if isinstance(node, nodes.And):
+            return lambda fields: left(fields) and right(fields)
+        return lambda fields: left(fields) or right(fields)
+    if isinstance(node, nodes.Not):
+        operand: Predicate | None = compile_expression(node.node, referenced)
+        if operand is None:
+            return None
+        return lambda fields: not operand(fields)
+    if isinstance(node, nodes.Test) and node.name == "none" and not node.args and not node.kwargs:
+        tested: Predicate | None = compile_expression(node.node, referenced)
+        if tested is None:
+            return None
+        return lambda fields: tested(fields) is None
+    if isinstance(node, nodes.Compare) and len(node.ops) == 1 and node.ops[0].op in COMPARISONS:
+        lhs: Predicate | None = compile_expression(node.expr, referenced)
+        rhs: Predicate | None = compile_expression(node.ops[0].expr, referenced)
+        if lhs is None or rhs is None:
+            return None
+        compare: Callable[[Any, Any], bool] = COMPARISONS[node.ops[0].op]
+        return lambda fields: compare(lhs(fields), rhs(fields))
+    return None
+
+
+def native_condition(
+    condition_config: list[ConfigType], fallback: ConditionCheckerType, name: str = DOMAIN
+) -> ConditionCheckerType:
+    """Wrap a Home Assistant condition checker with a native predicate where the conditions allow it"""
+    referenced: set[str] = set()
+    predicate = compile_conditions(condition_config, referenced)
+    if predicate is None:
+        _LOGGER.debug("AUTOARM Transition %s uses template engine", name)
+        return fallback
+    _LOGGER.debug("AUTOARM Transition %s compiled to native predicate using %s", name, sorted(referenced))
+    return NativeCondition(predicate, fallback, frozenset(referenced))
+
+
+class TransitionTable:
+    """Winning transition for each combination of the finite decision inputs
+
+    Only possible when every transition is a native condition whose fields are fully determined by
+    `ConditionVariables.decision_key`, so conditions using templates, other entities or the occupant
+    lists are never tabulated. Any calendar event behaves the same for native expressions, since it is
+    always truthy, never equal to a literal and never renders as `true`
+    """
+
+    def __init__(self, transitions: dict[AlarmControlPanelState, NativeCondition]) -> None:
+        self.transitions = transitions
+        self.outcomes: dict[tuple[bool | None, bool, str, bool, str, str], AlarmControlPanelState | None] = {}
+
+    @classmethod
+    def build(
+        cls,
+        transitions: Mapping[AlarmControlPanelState, ConditionCheckerType],
+        occupied_defaults: dict[str, AlarmControlPanelState],
+    ) -> "TransitionTable | None":
+        """Enumerate outcomes for all occupancy, sun, alarm state and calendar combinations, or None if not eligible"""
+        native: dict[AlarmControlPanelState, NativeCondition] = {}
+        for state, checker in transitions.items():
+            if not isinstance(checker, NativeCondition) or not checker.fields <= TABLE_FIELDS:
+                _LOGGER.debug("AUTOARM Transition table not used, %s depends on more than decision inputs", state)
+                return None
+            native[state] = checker
+        table = cls(native)
+        for occupied, night, state, calendar_event in itertools.product(
+            (True, False, None), (True, False), AlarmControlPanelState, (None, TABLE_CALENDAR_EVENT)
+        ):
+            table.lookup(
+                ConditionVariables(
+                    occupied=occupied,
+                    unoccupied=None if occupied is None else not occupied,
+                    night=night,
+                    state=state,
+                    occupied_defaults=occupied_defaults,
+                    calendar_event=calendar_event,
+                )
+            )
+        _LOGGER.debug("AUTOARM Transition table built with %s outcomes", len(table.outcomes))
+        return table
+
+    def lookup(self, condition_variables: ConditionVariables) -> AlarmControlPanelState | None:
+        """First transition to match, evaluating and remembering any combination not yet seen"""
+        key = condition_variables.decision_key
+        if key in self.outcomes:
+            return self.outcomes[key]
+        fields: Mapping[str, Any] = condition_variables.as_dict()
+        outcome: AlarmControlPanelState | None = next(
+            (state for state, checker in self.transitions.items() if checker.predicate(fields)), None
+        )
+        self.outcomes[key] = outcome
+        return outcome
@@ -1,15 +1,28 @@
 import asyncio
 import datetime as dt
-from typing import TYPE_CHECKING
+from functools import partial
+from typing import TYPE_CHECKING, Any
+from unittest.mock import Mock, patch
 
 import homeassistant.util.dt as dt_util
 from homeassistant.components.alarm_control_panel.const import AlarmControlPanelState
 from homeassistant.components.calendar import CalendarEntity
-from homeassistant.core import HomeAssistant
+from homeassistant.const import EVENT_HOMEASSISTANT_FINAL_WRITE
+from homeassistant.core import Event, HomeAssistant
+from pytest_homeassistant_custom_component.common import async_capture_events, async_fire_time_changed
 
 from conftest import TEST_PANEL
-from custom_components.autoarm.autoarming import AlarmArmer, Intervention
+from custom_components.autoarm.autoarming import (
+    STORAGE_KEY,
+    STORAGE_VERSION,
+    STORE_SAVE_DELAY,
+    AlarmArmer,
+    Intervention,
+    InterventionStore,
+)
+from custom_components.autoarm.calendar_events import TrackedCalendar
 from custom_components.autoarm.const import ChangeSource
+from custom_components.autoarm.notifier import Notifier
 
 if TYPE_CHECKING:
     from custom_components.autoarm.calendar_events import TrackedCalendarEvent
@@ -54,13 +67,15 @@ def test_unoccupied_night(autoarmer: AlarmArmer, night: None, unoccupied: None)
     assert autoarmer.determine_state() == AlarmControlPanelState.ARMED_AWAY
 
 
-def test_not_occupied(hass: HomeAssistant, autoarmer: AlarmArmer) -> None:
+async def test_not_occupied(hass: HomeAssistant, autoarmer: AlarmArmer) -> None:
     hass.states.async_set("person.tester_bob", "away")
+    await hass.async_block_till_done()
     assert autoarmer.is_occupied() is False
 
 
-def test_occupied(hass: HomeAssistant, autoarmer: AlarmArmer) -> None:
+async def test_occupied(hass: HomeAssistant, autoarmer: AlarmArmer) -> None:
     hass.states.async_set("person.tester_bob", "home")
+    await hass.async_block_till_done()
     assert autoarmer.is_occupied() is True
 
 
@@ -90,7 +105,7 @@ async def test_on_sunrise_with_cutoff_active_no_interventions(
     await autoarmer.arm(AlarmControlPanelState.PENDING)
     await hass.async_block_till_done()
     autoarmer.sunrise_cutoff = (dt_util.now() + dt.timedelta(seconds=2)).time()  # type: ignore[attr-defined]
-    autoarmer.interventions = []
+    autoarmer.interventions.clear()
     await autoarmer.on_sunrise()
     await hass.async_block_till_done()
     # wait for delayed_reset
@@ -176,6 +191,38 @@ async def test_reset_armed_state_uses_daytime_default(hass: HomeAssistant) -> No
     assert await autoarmer.reset_armed_state() == "disarmed"
 
 
+async def test_slow_calendar_does_not_hold_up_others(hass: HomeAssistant, test_config_calendars: None) -> None:
+    polled: list[str] = []
+
+    async def reconcile(calendar: TrackedCalendar) -> None:
+        if calendar.entity_id == "calendar.family_events":
+            await asyncio.sleep(60)
+        polled.append(calendar.entity_id)
+
+    autoarmer = AlarmArmer(
+        hass,
+        TEST_PANEL,
+        calendar_config={
+            "calendars": [
+                {"entity_id": "calendar.family_events", "state_patterns": {"armed_vacation": "Holiday.*"}},
+                {"entity_id": "calendar.alarm_control", "state_patterns": {"disarmed": "Disarmed"}},
+            ]
+        },
+    )
+    with (
+        patch("custom_components.autoarm.calendar_events.CALENDAR_INIT_TIMEOUT_SECONDS", 0.1),
+        patch.object(TrackedCalendar, "reconcile", autospec=True, side_effect=reconcile),
+    ):
+        await autoarmer.initialize()
+
+    assert polled == ["calendar.alarm_control"]
+    assert [calendar.entity_id for calendar in autoarmer.calendars] == ["calendar.family_events", "calendar.alarm_control"]
+    assert autoarmer.calendars[0].enabled
+    assert autoarmer.calendars[0].next_poll is not None
+    assert autoarmer.app_health_tracker.initialization_errors == {"calendar_timeout": 1}
+    autoarmer.shutdown()
+
+
 async def test_housekeeping_prunes_calendar_events(hass: HomeAssistant, local_calendar: CalendarEntity) -> None:
     await local_calendar.async_create_event(
         dtstart=dt_util.now() - dt.timedelta(minutes=5),
@@ -220,3 +267,340 @@ async def test_housekeeping_prunes_old_interventions(hass: HomeAssistant) -> Non
 
     await autoarmer.housekeeping(dt_util.now())
     assert len(autoarmer.interventions) == 0
+
+
+def test_intervention_store_orders_and_expires() -> None:
+    store = InterventionStore(ttl=dt.timedelta(minutes=10))
+    start = dt_util.now()
+    button = Intervention(start, ChangeSource.BUTTON, AlarmControlPanelState.ARMED_AWAY)
+    reset = Intervention(start + dt.timedelta(minutes=5), ChangeSource.BUTTON, None)
+    mobile = Intervention(start + dt.timedelta(minutes=2), ChangeSource.MOBILE, AlarmControlPanelState.DISARMED)
+    for intervention in (button, reset, mobile):
+        store.add(intervention)
+
+    assert list(store) == [button, mobile, reset]
+    assert store.latest_state is mobile
+    assert store.has_since(start + dt.timedelta(minutes=4))
+    assert not store.has_since(start + dt.timedelta(minutes=5))
+
+    store.add(Intervention(start + dt.timedelta(minutes=11), ChangeSource.BUTTON, None))
+    assert len(store) == 3
+    assert store.latest_state is mobile
+    store.evict(start + dt.timedelta(minutes=12))
+    assert len(store) == 2
+    assert store.latest_state is None
+
+
+async def test_restored_intervention_survives_restart(hass: HomeAssistant, hass_storage: dict[str, Any]) -> None:
+    hass_storage[STORAGE_KEY] = {
+        "version": STORAGE_VERSION,
+        "minor_version": 1,
+        "key": STORAGE_KEY,
+        "data": {
+            "interventions": [
+                Intervention(
+                    dt_util.now() - dt.timedelta(minutes=5), ChangeSource.BUTTON, AlarmControlPanelState.ARMED_AWAY
+                ).as_dict()
+            ],
+            "pre_pending_state": "armed_home",
+            "calendar_previous_states": {"calendar.family:abc": "armed_night"},
+        },
+    }
+    hass.states.async_set("person.tester_bob", "home")
+    hass.states.async_set("sun.sun", "above_horizon")
+    hass.states.async_set(TEST_PANEL, "armed_away")
+    autoarmer = AlarmArmer(hass, TEST_PANEL, occupancy={"entity_id": ["person.tester_bob"]})
+    await autoarmer.initialize()
+
+    assert autoarmer.armed_state() == AlarmControlPanelState.ARMED_AWAY
+    last_calculation = hass.states.get("sensor.autoarm_last_calculation")
+    assert last_calculation is not None
+    assert last_calculation.attributes["reset_decision"] == "ignore_after_manual_intervention"
+    assert autoarmer.pre_pending_state == AlarmControlPanelState.ARMED_HOME
+    assert autoarmer.last_state_intervention() is not None
+    autoarmer.shutdown()
+
+
+async def test_saved_state_writes_are_batched(hass: HomeAssistant, hass_storage: dict[str, Any], autoarmer: AlarmArmer) -> None:
+    with patch.object(autoarmer.store, "async_delay_save", wraps=autoarmer.store.async_delay_save) as delay_save:
+        for _ in range(3):
+            autoarmer.record_intervention(ChangeSource.BUTTON, AlarmControlPanelState.ARMED_HOME)
+        await hass.async_block_till_done()
+    assert {call.args[1] for call in delay_save.call_args_list} == {STORE_SAVE_DELAY}
+    assert STORAGE_KEY not in hass_storage
+
+    # pending writes are flushed when Home Assistant stops
+    hass.bus.async_fire(EVENT_HOMEASSISTANT_FINAL_WRITE)
+    await hass.async_block_till_done()
+    saved = hass_storage[STORAGE_KEY]["data"]
+    assert len(saved["interventions"]) >= 3
+    assert saved["interventions"][-1]["state"] == "armed_home"
+
+
+async def test_restore_skips_invalid_interventions(hass: HomeAssistant, hass_storage: dict[str, Any]) -> None:
+    valid = Intervention(dt_util.now() - dt.timedelta(minutes=5), ChangeSource.BUTTON, AlarmControlPanelState.ARMED_AWAY)
+    hass_storage[STORAGE_KEY] = {
+        "version": STORAGE_VERSION,
+        "minor_version": 1,
+        "key": STORAGE_KEY,
+        "data": {
+            "interventions": [
+                {"created_at": valid.created_at.isoformat(), "source": "renamed_source", "state": "armed_home"},
+                {"source": "button"},
+                "garbage",
+                valid.as_dict(),
+            ],
+        },
+    }
+    autoarmer = AlarmArmer(hass, TEST_PANEL)
+    await autoarmer.initialize()
+
+    assert list(autoarmer.interventions) == [valid]
+    assert "restore" not in autoarmer.app_health_tracker.initialization_errors
+    autoarmer.shutdown()
+
+
+async def test_pending_save_captured_at_shutdown(
+    hass: HomeAssistant, hass_storage: dict[str, Any], local_calendar: CalendarEntity
+) -> None:
+    await local_calendar.async_create_event(
+        dtstart=dt_util.now() - dt.timedelta(minutes=5),
+        dtend=dt_util.now() + dt.timedelta(hours=1),
+        summary="Away Day",
+    )
+    hass.states.async_set(TEST_PANEL, "disarmed")
+    autoarmer = AlarmArmer(
+        hass,
+        TEST_PANEL,
+        calendar_config={"calendars": [{"entity_id": "calendar.testing_calendar", "state_patterns": {"armed_away": "Away"}}]},
+    )
+    await autoarmer.initialize()
+    cal_event: TrackedCalendarEvent | None = autoarmer.active_calendar_event()
+    assert cal_event is not None
+    assert autoarmer.save_pending
+    assert STORAGE_KEY not in hass_storage
+
+    autoarmer.shutdown()
+    # any write still pending from before shutdown must not see the cleared calendars
+    hass.bus.async_fire(EVENT_HOMEASSISTANT_FINAL_WRITE)
+    await hass.async_block_till_done()
+    assert hass_storage[STORAGE_KEY]["data"]["calendar_previous_states"] == {cal_event.id: "disarmed"}
+
+
+async def test_scheduled_jobs_pruned_when_fired(hass: HomeAssistant, autoarmer: AlarmArmer) -> None:
+    fired: list[str] = []
+
+    async def record(_now: dt.datetime, name: str) -> None:
+        fired.append(name)
+
+    jobs = autoarmer.scheduled_jobs
+    first = jobs.schedule(dt_util.now() + dt.timedelta(seconds=5), partial(record, name="first"))
+    jobs.schedule(dt_util.now() + dt.timedelta(seconds=5), partial(record, name="replaced"), job_id="reset_button")
+    jobs.schedule(dt_util.now() + dt.timedelta(seconds=5), partial(record, name="replacement"), job_id="reset_button")
+    assert set(jobs.pending()) == {first, "reset_button"}
+
+    async_fire_time_changed(hass, dt_util.utcnow() + dt.timedelta(seconds=6))
+    await hass.async_block_till_done()
+    assert sorted(fired) == ["first", "replacement"]
+    assert len(jobs) == 0
+
+
+async def test_delayed_reset_replaces_pending_reset(autoarmer: AlarmArmer) -> None:
+    for delay in (10, 20):
+        job_id = autoarmer.schedule_state(
+            dt_util.now() + dt.timedelta(seconds=delay), None, None, source=ChangeSource.OCCUPANCY
+        )
+    assert job_id == "reset_occupancy"
+    autoarmer.schedule_state(dt_util.now() + dt.timedelta(seconds=10), AlarmControlPanelState.ARMED_HOME, None)
+    assert len(autoarmer.scheduled_jobs) == 2
+    autoarmer.shutdown()
+    assert len(autoarmer.scheduled_jobs) == 0
+
+
+async def test_bouncing_occupancy_evaluates_settled_state_once(hass: HomeAssistant) -> None:
+    hass.states.async_set("person.tester_bob", "home")
+    autoarmer = AlarmArmer(
+        hass,
+        TEST_PANEL,
+        occupancy={"entity_id": ["person.tester_bob"], "delay_time": {"not_home": dt.timedelta(seconds=30)}},
+    )
+    await autoarmer.initialize()
+
+    with patch.object(autoarmer, "reset_armed_state", wraps=autoarmer.reset_armed_state) as reset:
+        for state in ("not_home", "home", "not_home", "home", "not_home"):
+            hass.states.async_set("person.tester_bob", state)
+            await hass.async_block_till_done()
+        # home has no delay, so each return is evaluated at once
+        assert reset.call_count == 2
+        assert list(autoarmer.scheduled_jobs.pending()) == ["reset_occupancy"]
+        assert autoarmer.scheduled_jobs.cancellations == {"reset_occupancy": 2}
+
+        async_fire_time_changed(hass, dt_util.utcnow() + dt.timedelta(seconds=31))
+        await hass.async_block_till_done()
+        assert reset.call_count == 3
+    assert autoarmer.armed_state() == AlarmControlPanelState.ARMED_AWAY
+    autoarmer.shutdown()
+
+
+async def test_snapshot_reads_occupancy_once(hass: HomeAssistant, autoarmer: AlarmArmer) -> None:
+    hass.states.async_set("person.tester_bob", "home")
+    hass.states.async_set("sun.sun", "below_horizon")
+    await hass.async_block_till_done()
+    hass.states.async_set(TEST_PANEL, "armed_home")
+    snapshot = autoarmer.snapshot()
+    assert snapshot.armed_state == AlarmControlPanelState.ARMED_HOME
+    assert snapshot.occupied is True
+    assert snapshot.unoccupied is False
+    assert snapshot.at_home == ("person.tester_bob",)
+    assert snapshot.not_home == ()
+    assert snapshot.night is True
+    assert snapshot.active_calendar_event is None
+
+
+async def test_reset_exposes_snapshot_on_last_calculation(hass: HomeAssistant, autoarmer: AlarmArmer) -> None:
+    hass.states.async_set("person.tester_bob", "not_home")
+    hass.states.async_set("sun.sun", "above_horizon")
+    await hass.async_block_till_done()
+    hass.states.async_set(TEST_PANEL, "disarmed")
+    await hass.async_block_till_done()
+    await autoarmer.reset_armed_state(source=ChangeSource.OCCUPANCY)
+    last_calculation = hass.states.get("sensor.autoarm_last_calculation")
+    assert last_calculation is not None
+    snapshot = last_calculation.attributes["snapshot"]
+    assert snapshot["armed_state"] == "disarmed"
+    assert snapshot["occupied"] is False
+    assert snapshot["not_home"] == ["person.tester_bob"]
+    assert snapshot["night"] is False
+
+
+async def test_occupancy_burst_coalesced_into_one_reset(hass: HomeAssistant) -> None:
+    autoarmer = AlarmArmer(
+        hass,
+        TEST_PANEL,
+        occupancy={"entity_id": ["person.tester_bob", "person.tester_sue"]},
+        coalesce_window=dt.timedelta(seconds=5),
+    )
+    hass.states.async_set("person.tester_bob", "not_home")
+    hass.states.async_set("person.tester_sue", "not_home")
+    hass.states.async_set("sun.sun", "below_horizon")
+    await autoarmer.initialize()
+    hass.states.async_set(TEST_PANEL, "armed_away")
+    await hass.async_block_till_done()
+    changes: list[Event] = async_capture_events(hass, "autoarm_change")
+
+    with patch.object(autoarmer, "reset_armed_state", wraps=autoarmer.reset_armed_state) as reset:
+        hass.states.async_set("person.tester_bob", "home")
+        hass.states.async_set("person.tester_sue", "home")
+        await hass.async_block_till_done()
+        await autoarmer.on_sunset()
+        reset.assert_not_called()
+
+        async_fire_time_changed(hass, dt_util.utcnow() + dt.timedelta(seconds=6))
+        await hass.async_block_till_done()
+        reset.assert_called_once_with(
+            source=ChangeSource.OCCUPANCY,
+            coalesced_sources=[ChangeSource.OCCUPANCY, ChangeSource.SUNSET],
+            coalesced_entity_ids=["person.tester_bob", "person.tester_sue"],
+        )
+
+    assert autoarmer.armed_state() == AlarmControlPanelState.ARMED_NIGHT
+    assert len(changes) == 1
+    assert changes[0].data["context"]["coalesced_sources"] == ["occupancy", "sunset"]
+    autoarmer.shutdown()
+
+
+async def test_coalesced_reset_applies_entity_rate_limit(hass: HomeAssistant) -> None:
+    hass.states.async_set("person.tester_bob", "not_home")
+    autoarmer = AlarmArmer(
+        hass,
+        TEST_PANEL,
+        occupancy={"entity_id": ["person.tester_bob"]},
+        coalesce_window=dt.timedelta(seconds=5),
+        rate_limit={"entities": {"person.tester_bob": {"period": dt.timedelta(seconds=60), "max_calls": 1}}},
+    )
+    await autoarmer.initialize()
+    hass.states.async_set(TEST_PANEL, "armed_away")
+    await hass.async_block_till_done()
+
+    hass.states.async_set("person.tester_bob", "home")
+    await hass.async_block_till_done()
+    async_fire_time_changed(hass, dt_util.utcnow() + dt.timedelta(seconds=6))
+    await hass.async_block_till_done()
+    assert autoarmer.armed_state() == AlarmControlPanelState.ARMED_HOME
+    assert autoarmer.rate_limiter.as_dict()["entity:person.tester_bob"]["remaining"] == 0
+
+    hass.states.async_set("person.tester_bob", "not_home")
+    await hass.async_block_till_done()
+    async_fire_time_changed(hass, dt_util.utcnow() + dt.timedelta(seconds=12))
+    await hass.async_block_till_done()
+    assert autoarmer.armed_state() == AlarmControlPanelState.ARMED_HOME
+    last_calculation = hass.states.get("sensor.autoarm_last_calculation")
+    assert last_calculation is not None
+    assert last_calculation.attributes["rate_limited_by"] == "entity:person.tester_bob"
+    autoarmer.shutdown()
+
+
+async def test_intervention_bypasses_coalescing(hass: HomeAssistant) -> None:
+    autoarmer = AlarmArmer(
+        hass, TEST_PANEL, occupancy={"entity_id": ["person.tester_bob"]}, coalesce_window=dt.timedelta(seconds=5)
+    )
+    await autoarmer.initialize()
+    hass.states.async_set("person.tester_bob", "home")
+    await hass.async_block_till_done()
+    assert autoarmer.coalesce_unsub is not None
+
+    with patch.object(autoarmer, "reset_armed_state", wraps=autoarmer.reset_armed_state) as reset:
+        await autoarmer.reset_service(Mock())
+        reset.assert_called_once()
+    autoarmer.shutdown()
+    assert autoarmer.coalesce_unsub is None
+
+
+async def test_entity_rate_limit_reported(hass: HomeAssistant) -> None:
+    hass.states.async_set("person.tester_bob", "not_home")
+    autoarmer = AlarmArmer(
+        hass,
+        TEST_PANEL,
+        occupancy={"entity_id": ["person.tester_bob"]},
+        rate_limit={"entities": {"person.tester_bob": {"period": dt.timedelta(seconds=60), "max_calls": 1}}},
+    )
+    await autoarmer.initialize()
+    rejections: list[Event] = async_capture_events(hass, "autoarm_rate_limited")
+
+    for expected in (AlarmControlPanelState.ARMED_AWAY, AlarmControlPanelState.DISARMED):
+        hass.states.async_set(TEST_PANEL, "disarmed")
+        await hass.async_block_till_done()
+        await autoarmer.reset_armed_state(source=ChangeSource.OCCUPANCY, entity_id="person.tester_bob")
+        assert autoarmer.armed_state() == expected
+
+    last_calculation = hass.states.get("sensor.autoarm_last_calculation")
+    assert last_calculation is not None
+    assert last_calculation.attributes["reset_decision"] == "rate_limited"
+    assert last_calculation.attributes["rate_limited_by"] == "entity:person.tester_bob"
+    assert len(rejections) == 1
+    assert rejections[0].data["rate_limited_by"] == "entity:person.tester_bob"
+    assert rejections[0].data["requested_state"] == AlarmControlPanelState.ARMED_AWAY
+    autoarmer.shutdown()
+
+
+async def test_concurrent_arm_requests_applied_in_call_order(autoarmer: AlarmArmer) -> None:
+    assert await asyncio.gather(
+        autoarmer.arm(AlarmControlPanelState.DISARMED, source=ChangeSource.BUTTON),
+        autoarmer.arm(AlarmControlPanelState.ARMED_NIGHT, source=ChangeSource.BUTTON),
+    ) == [AlarmControlPanelState.DISARMED, AlarmControlPanelState.ARMED_NIGHT]
+    assert autoarmer.armed_state() == AlarmControlPanelState.ARMED_NIGHT
+
+
+async def test_arm_does_not_wait_for_notification(hass: HomeAssistant, autoarmer: AlarmArmer) -> None:
+    release = asyncio.Event()
+
+    async def slow_notify(**_kwargs: object) -> None:
+        await release.wait()
+
+    autoarmer.notifier = Notifier({}, hass, autoarmer.app_health_tracker, "notify.slow")
+    with patch.object(autoarmer.notifier, "notify", side_effect=slow_notify) as notify:
+        assert await autoarmer.arm(AlarmControlPanelState.ARMED_VACATION, source=ChangeSource.BUTTON) == "armed_vacation"
+        assert await autoarmer.arm(AlarmControlPanelState.DISARMED, source=ChangeSource.BUTTON) == "disarmed"
+        release.set()
+        await hass.async_block_till_done()
+    assert [c.kwargs["to_state"] for c in notify.call_args_list] == ["armed_vacation", "disarmed"]
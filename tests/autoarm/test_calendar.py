@@ -1,19 +1,27 @@
 import asyncio
 import datetime as dt
 from collections.abc import AsyncGenerator
+from unittest.mock import patch
 
 import homeassistant.util.dt as dt_util
 import pytest
 from homeassistant.components.alarm_control_panel.const import AlarmControlPanelState
 from homeassistant.components.calendar import EVENT_END, EVENT_START, CalendarEntity, CalendarEvent
 from homeassistant.const import CONF_ENTITY_ID
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers.entity_platform import EntityPlatform
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
 
 from custom_components.autoarm.autoarming import AlarmArmer
 from custom_components.autoarm.calendar_events import TrackedCalendar, TrackedCalendarEvent
 from custom_components.autoarm.const import (
+    CALENDAR_MAX_POLL_INTERVAL,
+    CALENDAR_PUSH_POLL_INTERVAL,
+    CALENDAR_TRACKING_PUSH,
     CONF_CALENDAR_EVENT_STATES,
     CONF_CALENDAR_POLL_INTERVAL,
+    CONF_CALENDAR_TRACKING,
     NO_CAL_EVENT_MODE_AUTO,
     ChangeSource,
 )
@@ -71,9 +79,27 @@ async def test_calendar_finds_alarm_states(simple_tracked_calendar: TrackedCalen
             "recurring": False,
             "overridable_event": True,
         },
+        entity_id="calendar.testing_calendar",
     )  # type: ignore
 
 
+@pytest.mark.parametrize(
+    ("summary", "description", "expected"),
+    [
+        ("Holidays in Bahamas!!", None, "armed_vacation"),
+        ("Away day", "Holidays", "armed_away"),
+        ("Holidays", "Set to ARMED_HOME while the builders are in", "armed_home"),
+        ("Weekend away", "Holiday cottage", "armed_vacation"),
+        ("Dentist", "", None),
+        (None, None, None),
+    ],
+)
+async def test_calendar_match_priority(
+    simple_tracked_calendar: TrackedCalendar, summary: str | None, description: str | None, expected: str | None
+) -> None:
+    assert simple_tracked_calendar.match_event(summary, description) == expected
+
+
 async def test_calendar_bare_lifecycle(simple_tracked_calendar: TrackedCalendar) -> None:
     assert simple_tracked_calendar.enabled
     await simple_tracked_calendar.match_events()
@@ -106,6 +132,7 @@ async def test_calendar_tracks_event(
             "recurring": False,
             "overridable_event": False,
         },
+        entity_id="calendar.testing_calendar",
     )  # type: ignore
     calendar_with_holiday_event.shutdown()
     assert not calendar_with_holiday_event.has_active_event()
@@ -136,6 +163,159 @@ async def test_calendar_prunes_events(
     assert next(i for i in simple_tracked_calendar.tracked_events.values()).event.summary == "Holidays in Bahamas!!"
 
 
+async def test_calendar_poll_fetches_once_covering_tracked_events(
+    calendar_with_holiday_event: TrackedCalendar, local_calendar: CalendarEntity
+) -> None:
+    await local_calendar.async_create_event(
+        dtstart=dt_util.now() - dt.timedelta(minutes=5),
+        dtend=dt_util.now() + dt.timedelta(days=14),
+        summary="Holidays in Fiji",
+    )
+    await calendar_with_holiday_event.on_timed_poll(dt_util.now())
+    assert len(calendar_with_holiday_event.tracked_events) == 2
+
+    with patch.object(local_calendar, "async_get_events", wraps=local_calendar.async_get_events) as fetch:
+        await calendar_with_holiday_event.on_timed_poll(dt_util.now())
+        assert fetch.call_count == 1
+        _hass, start_dt, end_dt = fetch.call_args.args
+        assert start_dt <= dt_util.now() - dt.timedelta(minutes=15)
+        assert end_dt >= dt_util.now() + dt.timedelta(days=13)
+
+        await calendar_with_holiday_event.prune_events()
+        assert fetch.call_count == 1
+    assert len(calendar_with_holiday_event.tracked_events) == 2
+
+
+async def test_calendar_poll_prunes_deleted_event(
+    calendar_with_holiday_event: TrackedCalendar, local_calendar: CalendarEntity
+) -> None:
+    tracked_event: TrackedCalendarEvent = next(i for i in calendar_with_holiday_event.tracked_events.values())
+    assert tracked_event.event.uid is not None
+    await local_calendar.async_delete_event(tracked_event.event.uid)
+
+    await calendar_with_holiday_event.on_timed_poll(dt_util.now())
+    assert calendar_with_holiday_event.tracked_events == {}
+    assert tracked_event.track_status == "ended"
+
+
+async def test_empty_calendar_backs_off_polling(simple_tracked_calendar: TrackedCalendar, hass: HomeAssistant) -> None:
+    assert simple_tracked_calendar.interval == 20
+    intervals: list[int] = []
+    for _ in range(6):
+        await simple_tracked_calendar.on_timed_poll(dt_util.now())
+        intervals.append(simple_tracked_calendar.interval)
+    assert intervals == [40, 80, 160, CALENDAR_MAX_POLL_INTERVAL, CALENDAR_MAX_POLL_INTERVAL, CALENDAR_MAX_POLL_INTERVAL]
+
+    next_poll = simple_tracked_calendar.next_poll
+    assert next_poll is not None
+    assert next_poll.second == 0
+    assert dt.timedelta(minutes=CALENDAR_MAX_POLL_INTERVAL) <= next_poll - dt_util.now()
+    assert simple_tracked_calendar.as_dict()["next_poll"] == next_poll.isoformat()
+
+    with patch.object(simple_tracked_calendar, "reconcile") as reconcile:
+        async_fire_time_changed(hass, next_poll)
+        await hass.async_block_till_done()
+        reconcile.assert_called_once()
+
+
+async def test_polling_resets_and_comes_sooner_near_event(
+    simple_tracked_calendar: TrackedCalendar, local_calendar: CalendarEntity
+) -> None:
+    await simple_tracked_calendar.on_timed_poll(dt_util.now())
+    assert simple_tracked_calendar.interval == 40
+    starts_at: dt.datetime = dt_util.now() + dt.timedelta(minutes=3)
+    await local_calendar.async_create_event(
+        dtstart=starts_at, dtend=starts_at + dt.timedelta(hours=1), summary="Dentist appointment"
+    )
+
+    await simple_tracked_calendar.on_timed_poll(dt_util.now())
+    assert simple_tracked_calendar.interval == 10
+    assert simple_tracked_calendar.next_poll is not None
+    assert starts_at <= simple_tracked_calendar.next_poll <= starts_at + dt.timedelta(minutes=1)
+
+
+async def test_failed_poll_keeps_interval_and_reschedules(
+    simple_tracked_calendar: TrackedCalendar, local_calendar: CalendarEntity
+) -> None:
+    simple_tracked_calendar.next_poll = None
+    with (
+        patch.object(local_calendar, "async_get_events", side_effect=HomeAssistantError("server down")),
+        pytest.raises(HomeAssistantError),
+    ):
+        await simple_tracked_calendar.on_timed_poll(dt_util.now())
+    assert simple_tracked_calendar.interval == 20
+    assert simple_tracked_calendar.next_poll is not None
+
+
+async def test_failed_reconcile_still_reschedules(
+    local_calendar: CalendarEntity, calendar_platform: EntityPlatform, mock_armer_real_hass: AlarmArmer
+) -> None:
+    uut = TrackedCalendar(
+        mock_armer_real_hass.hass,
+        {
+            CONF_ENTITY_ID: local_calendar.entity_id,
+            CONF_CALENDAR_POLL_INTERVAL: 10,
+            CONF_CALENDAR_EVENT_STATES: {"armed_vacation": ["Holiday.*"]},
+        },
+        no_event_mode=NO_CAL_EVENT_MODE_AUTO,
+        armer=mock_armer_real_hass,
+        app_health_tracker=mock_armer_real_hass.app_health_tracker,
+    )
+    with patch.object(uut, "match_events", side_effect=ValueError("bad event")):
+        await uut.initialize(calendar_platform)
+        assert uut.enabled
+        assert uut.next_poll is not None
+        assert uut.poller_listener is not None
+
+        uut.next_poll = None
+        with pytest.raises(ValueError, match="bad event"):
+            await uut.on_timed_poll(dt_util.now())
+        assert uut.next_poll is not None
+        assert uut.interval == 10
+    uut.shutdown()
+
+
+async def test_push_tracking_reconciles_on_calendar_change(
+    local_calendar: CalendarEntity, calendar_platform: EntityPlatform, mock_armer_real_hass: AlarmArmer
+) -> None:
+    uut = TrackedCalendar(
+        mock_armer_real_hass.hass,
+        {
+            CONF_ENTITY_ID: local_calendar.entity_id,
+            CONF_CALENDAR_POLL_INTERVAL: 10,
+            CONF_CALENDAR_TRACKING: CALENDAR_TRACKING_PUSH,
+            CONF_CALENDAR_EVENT_STATES: {"armed_vacation": ["Holiday.*"]},
+        },
+        no_event_mode=NO_CAL_EVENT_MODE_AUTO,
+        armer=mock_armer_real_hass,
+        app_health_tracker=mock_armer_real_hass.app_health_tracker,
+    )
+    await uut.initialize(calendar_platform)
+    assert uut.poll_interval == CALENDAR_PUSH_POLL_INTERVAL
+    assert uut.tracked_events == {}
+
+    await local_calendar.async_create_event(
+        dtstart=dt_util.now() - dt.timedelta(minutes=2),
+        dtend=dt_util.now() + dt.timedelta(hours=2),
+        summary="Holidays in Bahamas!!",
+    )
+    await mock_armer_real_hass.hass.async_block_till_done()
+    assert len(uut.tracked_events) == 1
+    mock_armer_real_hass.arm.assert_called_once()  # type: ignore
+
+    uut.shutdown()
+    assert uut.state_listener is None
+
+
+async def test_expire_events_waits_for_reconcile(calendar_with_holiday_event: TrackedCalendar) -> None:
+    async with calendar_with_holiday_event.reconcile_lock:
+        expiry = asyncio.create_task(calendar_with_holiday_event.expire_events())
+        await asyncio.sleep(0)
+        assert not expiry.done()
+    assert await expiry is False
+    assert calendar_with_holiday_event.has_active_event()
+
+
 async def test_calendar_follows_event_name_change_no_longer_in_scope(
     calendar_with_holiday_event: TrackedCalendar,
     local_calendar: CalendarEntity,
@@ -1,12 +1,14 @@
 import logging
+from unittest.mock import patch
 
 import pytest
 from homeassistant.components.alarm_control_panel.const import AlarmControlPanelState
 from homeassistant.exceptions import ConditionError, HomeAssistantError
+from homeassistant.helpers import condition as condition_helper
 from homeassistant.helpers import config_validation as cv
 
 from custom_components.autoarm.const import ConditionVariables
-from custom_components.autoarm.hass_api import ConditionErrorLoggingAdaptor, HomeAssistantAPI
+from custom_components.autoarm.hass_api import ConditionErrorLoggingAdaptor, HomeAssistantAPI, condition_hash
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -122,3 +124,93 @@ def test_condition_error_logging_adaptor_error() -> None:
     # msg needs 2 %s because impl calls logger.error(msg, args_tuple, kwargs_dict)
     adaptor.error("%s %s", container)
     assert len(adaptor.condition_errors) == 1
+
+
+def test_condition_variables_context_built_once() -> None:
+    cvars = ConditionVariables(
+        False, True, False, AlarmControlPanelState.DISARMED, {}, at_home=["person.a"], not_home=["person.b"]
+    )
+    context = cvars.template_context
+    assert context is cvars.template_context
+    assert context["autoarm"] is cvars.as_dict()
+    assert context["autoarm"]["at_home"] == ["person.a"]
+    assert context["autoarm"]["not_home"] == ["person.b"]
+    with pytest.raises(TypeError):
+        context["autoarm"] = {}  # type: ignore[index]
+
+
+async def test_evaluates_not_home_condition(hass_api: HomeAssistantAPI) -> None:
+    cvars = ConditionVariables(False, True, False, AlarmControlPanelState.DISARMED, {}, at_home=[], not_home=["person.b"])
+    condition = cv.CONDITIONS_SCHEMA({
+        "condition": "template",
+        "value_template": "{{ 'person.b' in autoarm.not_home and not autoarm.at_home }}",
+    })
+    checker = await hass_api.build_condition(condition, strict=True)
+    assert checker is not None
+    assert hass_api.evaluate_condition(checker, cvars) is True
+
+
+async def test_compile_condition_returns_checker_with_strict_errors(hass_api: HomeAssistantAPI) -> None:
+    condition = cv.CONDITIONS_SCHEMA({"condition": "template", "value_template": "{{ notification_priority == 'critical' }}"})
+    compiled = await hass_api.compile_condition(condition, validate=True)
+    assert compiled.errors
+    assert "notification_priority" in str(compiled.errors[0])
+    assert hass_api.evaluate_condition(compiled.checker) is False
+    with pytest.raises(ConditionError):
+        compiled.verify()
+
+
+async def test_compile_condition_checks_nested_templates(hass_api: HomeAssistantAPI) -> None:
+    condition = cv.CONDITIONS_SCHEMA({
+        "condition": "or",
+        "conditions": ["{{ autoarm.occupied }}", "{{ autoarm.morning_coffee }}"],
+    })
+    compiled = await hass_api.compile_condition(condition)
+    assert compiled.errors
+    assert "morning_coffee" in str(compiled.errors[0])
+
+
+async def test_compile_condition_validates_once(hass_api: HomeAssistantAPI) -> None:
+    condition = cv.CONDITIONS_SCHEMA("{{ autoarm.occupied and not autoarm.night }}")
+    with patch(
+        "custom_components.autoarm.hass_api.condition_helper.async_validate_conditions_config",
+        wraps=condition_helper.async_validate_conditions_config,
+    ) as validator:
+        compiled = await hass_api.compile_condition(condition, validate=True)
+    validator.assert_called_once()
+    assert compiled.errors == []
+    compiled.verify()
+    cvars = ConditionVariables(True, False, False, AlarmControlPanelState.DISARMED, {})
+    assert hass_api.evaluate_condition(compiled.checker, cvars) is True
+
+
+async def test_compile_condition_reuses_cached(hass_api: HomeAssistantAPI) -> None:
+    compiled = await hass_api.compile_condition(cv.CONDITIONS_SCHEMA("{{ autoarm.occupied }}"), validate=True, name="a")
+    assert compiled.key is not None
+    assert await hass_api.compile_condition(cv.CONDITIONS_SCHEMA("{{ autoarm.occupied }}"), validate=True, name="a") is compiled
+    assert (
+        await hass_api.compile_condition(cv.CONDITIONS_SCHEMA("{{ autoarm.night }}"), validate=True, name="a") is not compiled
+    )
+    assert (
+        await hass_api.compile_condition(cv.CONDITIONS_SCHEMA("{{ autoarm.occupied }}"), validate=True, name="b")
+        is not compiled
+    )
+
+    hass_api.prune_condition_cache({compiled.key})
+    assert await hass_api.compile_condition(cv.CONDITIONS_SCHEMA("{{ autoarm.occupied }}"), validate=True, name="a") is compiled
+
+
+async def test_compile_condition_does_not_cache_errors(hass_api: HomeAssistantAPI) -> None:
+    condition = cv.CONDITIONS_SCHEMA("{{ autoarm.morning_coffee }}")
+    compiled = await hass_api.compile_condition(condition)
+    assert compiled.errors
+    assert await hass_api.compile_condition(condition) is not compiled
+
+
+def test_condition_hash_uses_template_source() -> None:
+    assert condition_hash(cv.CONDITIONS_SCHEMA("{{ autoarm.occupied }}")) == condition_hash(
+        cv.CONDITIONS_SCHEMA("{{ autoarm.occupied }}")
+    )
+    assert condition_hash(cv.CONDITIONS_SCHEMA("{{ autoarm.occupied }}")) != condition_hash(
+        cv.CONDITIONS_SCHEMA("{{ autoarm.night }}")
+    )
@@ -8,6 +8,7 @@ from custom_components.autoarm.const import ChangeSource
 from custom_components.autoarm.helpers import (
     AppHealthTracker,
     ExtendedExtendedJSONEncoder,
+    OccupancyIndex,
     change_source_as_enum,
     deobjectify,
     safe_state,
@@ -72,3 +73,42 @@ def test_app_health_tracker_records_runtime_error(hass: HomeAssistant) -> None:
     assert tracker.failures == 0
     tracker.record_runtime_error()
     assert tracker.failures == 1
+
+
+def test_occupancy_index_tracks_membership() -> None:
+    index = OccupancyIndex(["person.jack", "person.jill"])
+    assert index.is_occupied() is False
+    assert index.update("person.jill", "home") is True
+    assert index.update("person.jill", "home") is False
+    assert index.update("person.jack", "home") is True
+    assert index.home_count == 2
+    assert index.at_home() == ["person.jack", "person.jill"]
+    assert index.update("person.jack", "not_home") is True
+    assert index.is_occupied() is True
+    assert index.is_unoccupied() is False
+    assert index.at_home() == ["person.jill"]
+    assert index.not_home() == ["person.jack"]
+
+
+def test_occupancy_index_ignores_unknown_entities() -> None:
+    index = OccupancyIndex(["person.jack"])
+    assert index.update("person.stranger", "home") is False
+    assert index.update(None, "home") is False
+    assert index.is_occupied() is False
+
+
+def test_occupancy_index_unconfigured() -> None:
+    index = OccupancyIndex([])
+    assert index.is_occupied() is None
+    assert index.is_unoccupied() is None
+    assert index.at_home() is None
+    assert index.not_home() is None
+
+
+def test_occupancy_index_rebuild(hass: HomeAssistant) -> None:
+    hass.states.async_set("person.jack", "home")
+    hass.states.async_set("person.jill", "away")
+    index = OccupancyIndex(["person.jack", "person.jill", "person.missing"])
+    index.rebuild(hass)
+    assert index.at_home() == ["person.jack"]
+    assert index.not_home() == ["person.jill", "person.missing"]
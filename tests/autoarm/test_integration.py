@@ -2,16 +2,20 @@ import asyncio
 import datetime as dt
 import json
 from typing import Any
+from unittest.mock import patch
 
 from homeassistant.components.alarm_control_panel.const import ATTR_CHANGED_BY, AlarmControlPanelState
+from homeassistant.components.calendar import CalendarEntity
 from homeassistant.config_entries import ConfigEntryState
 from homeassistant.const import CONF_CONDITIONS, CONF_DELAY_TIME, CONF_ENTITY_ID
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers import condition as condition_helper
 from homeassistant.helpers import config_validation as cv
 from homeassistant.helpers import issue_registry as ir
 from homeassistant.setup import async_setup_component
 from pytest_homeassistant_custom_component.common import MockConfigEntry
 
+from custom_components.autoarm.autoarming import HASS_DATA_KEY
 from custom_components.autoarm.config_flow import (
     CONF_CALENDAR_ENTITIES,
     CONF_NO_EVENT_MODE,
@@ -21,8 +25,12 @@ from custom_components.autoarm.config_flow import (
 )
 from custom_components.autoarm.const import (
     ATTR_RESET,
+    CALENDAR_TRACKING_PUSH,
     CONF_ALARM_PANEL,
     CONF_BUTTONS,
+    CONF_CALENDAR_CONTROL,
+    CONF_CALENDAR_TRACKING,
+    CONF_CALENDARS,
     CONF_DIURNAL,
     CONF_EARLIEST,
     CONF_NOTIFY,
@@ -32,6 +40,7 @@ from custom_components.autoarm.const import (
     DOMAIN,
     YAML_DATA_KEY,
 )
+from custom_components.autoarm.hass_api import CONDITION_CACHE_KEY
 
 YAML_CONFIG: dict[str, Any] = {
     CONF_DIURNAL: {CONF_SUNRISE: {CONF_EARLIEST: "06:30:00"}},
@@ -63,14 +72,16 @@ ENTRY_OPTIONS: dict[str, Any] = {
 }
 
 
-async def _setup_entry(hass: HomeAssistant, yaml_config: dict[str, Any] | None = None) -> MockConfigEntry:
-    """Set up a config entry with optional YAML config."""
+async def _setup_entry(
+    hass: HomeAssistant, yaml_config: dict[str, Any] | None = None, options: dict[str, Any] | None = None
+) -> MockConfigEntry:
+    """Set up a config entry with optional YAML config and options."""
     hass.data[YAML_DATA_KEY] = yaml_config or YAML_CONFIG
     entry = MockConfigEntry(
         domain=DOMAIN,
         title="Auto Arm",
         data=ENTRY_DATA,
-        options=ENTRY_OPTIONS,
+        options=options or ENTRY_OPTIONS,
     )
     entry.add_to_hass(hass)
     await hass.config_entries.async_setup(entry.entry_id)
@@ -259,3 +270,41 @@ async def test_arm_fires_autoarming_event(hass: HomeAssistant, mock_notify: Any)
     assert data["original_state"] == AlarmControlPanelState.ARMED_HOME
     assert data["new_state"] == AlarmControlPanelState.ARMED_AWAY
     assert data["change_source"] == "occupancy"
+
+
+async def test_reload_reuses_compiled_conditions(hass: HomeAssistant, mock_notify: Any) -> None:
+    entry = await _setup_entry(hass, yaml_config={})
+    assert len(hass.data[CONDITION_CACHE_KEY]) == 5
+
+    with patch(
+        "custom_components.autoarm.hass_api.condition_helper.async_validate_conditions_config",
+        wraps=condition_helper.async_validate_conditions_config,
+    ) as validator:
+        await hass.config_entries.async_reload(entry.entry_id)
+        await hass.async_block_till_done()
+        validator.assert_not_called()
+        assert len(hass.data[HASS_DATA_KEY].armer.transitions) == 5
+
+        hass.data[YAML_DATA_KEY] = {
+            CONF_TRANSITIONS: {"armed_vacation": {CONF_CONDITIONS: cv.CONDITIONS_SCHEMA("{{ autoarm.bypass }}")}}
+        }
+        await hass.config_entries.async_reload(entry.entry_id)
+        await hass.async_block_till_done()
+        validator.assert_called_once()
+
+    assert len(hass.data[CONDITION_CACHE_KEY]) == 5
+
+
+async def test_calendar_tracking_from_yaml_override(
+    hass: HomeAssistant, mock_notify: Any, local_calendar: CalendarEntity
+) -> None:
+    yaml_config: dict[str, Any] = {
+        CONF_CALENDAR_CONTROL: {
+            CONF_CALENDARS: [{CONF_ENTITY_ID: local_calendar.entity_id, CONF_CALENDAR_TRACKING: CALENDAR_TRACKING_PUSH}]
+        }
+    }
+    await _setup_entry(hass, yaml_config, options={**ENTRY_OPTIONS, CONF_CALENDAR_ENTITIES: [local_calendar.entity_id]})
+
+    calendar = hass.data[HASS_DATA_KEY].armer.calendars[0]
+    assert calendar.tracking == CALENDAR_TRACKING_PUSH
+    assert calendar.state_listener is not None
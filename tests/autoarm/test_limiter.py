@@ -1,7 +1,11 @@
 import datetime as dt
 import time
 
-from custom_components.autoarm.helpers import Limiter
+import pytest
+import voluptuous as vol
+
+from custom_components.autoarm.const import RATE_LIMIT_SCHEMA
+from custom_components.autoarm.helpers import Limiter, LimiterRegistry
 
 
 def test_first_call_doesnt_trigger() -> None:
@@ -24,3 +28,81 @@ def test_window_works_trigger() -> None:
     time.sleep(4)
     assert not limiter.triggered()
     assert len(limiter.calls) == 1
+
+
+def test_rejected_calls_not_recorded() -> None:
+    limiter = Limiter(dt.timedelta(seconds=3), max_calls=2)
+    assert not limiter.triggered()
+    assert not limiter.triggered()
+    for _ in range(5):
+        assert limiter.triggered()
+    assert len(limiter.calls) == 2
+
+
+def test_remaining_and_reset_in() -> None:
+    limiter = Limiter(dt.timedelta(seconds=3), max_calls=2)
+    assert limiter.remaining() == 2
+    assert limiter.reset_in() == 0
+    assert not limiter.triggered()
+    assert limiter.remaining() == 1
+    assert limiter.reset_in() == 0
+    assert not limiter.triggered()
+    assert limiter.remaining() == 0
+    assert 2.5 < limiter.reset_in() <= 3
+
+
+def test_source_budget_protects_other_sources() -> None:
+    limiter = Limiter(dt.timedelta(seconds=3), max_calls=4, max_calls_per_source=2)
+    assert not limiter.triggered("button")
+    assert not limiter.triggered("button")
+    assert limiter.triggered("button")
+    assert limiter.triggered("button")
+    assert limiter.remaining("button") == 0
+    assert limiter.reset_in("button") > 0
+    assert limiter.remaining("calendar") == 2
+    assert not limiter.triggered("calendar")
+    assert not limiter.triggered("calendar")
+    assert limiter.remaining() == 0
+    assert limiter.triggered("sunset")
+
+
+def test_registry_names_rejecting_limiter() -> None:
+    registry = LimiterRegistry(
+        Limiter(dt.timedelta(seconds=3), max_calls=5, max_calls_per_source=3),
+        sources={"calendar": Limiter(dt.timedelta(seconds=3), max_calls=1)},
+        entities={"binary_sensor.button": Limiter(dt.timedelta(seconds=3), max_calls=1)},
+    )
+    assert registry.rejected_by("button", "binary_sensor.button") is None
+    assert registry.rejected_by("button", "binary_sensor.button") == "entity:binary_sensor.button"
+    assert registry.rejected_by("calendar", "calendar.home") is None
+    assert registry.rejected_by("calendar", "calendar.home") == "source:calendar"
+    assert registry.rejected_by("button", "binary_sensor.other") is None
+    assert registry.rejected_by("button", "binary_sensor.other") is None
+    assert registry.rejected_by("button", "binary_sensor.other") == "overall:button"
+    assert registry.rejected_by("sunset") is None
+    assert registry.rejected_by("occupancy") == "overall"
+    # rejected calls leave every budget untouched
+    assert registry.as_dict()["entity:binary_sensor.button"]["remaining"] == 0
+    assert registry.as_dict()["source:calendar"]["remaining"] == 0
+    assert registry.overall.remaining("button") == 0
+    assert registry.remaining("calendar") == 0
+    assert registry.reset_in("occupancy") > 0
+
+
+def test_registry_applies_every_entity_limiter() -> None:
+    registry = LimiterRegistry(
+        Limiter(dt.timedelta(seconds=3), max_calls=5),
+        entities={
+            "person.bob": Limiter(dt.timedelta(seconds=3), max_calls=2),
+            "person.sue": Limiter(dt.timedelta(seconds=3), max_calls=1),
+        },
+    )
+    assert registry.rejected_by("occupancy", "person.bob", "person.sue") is None
+    assert registry.rejected_by("occupancy", "person.bob", "person.sue") == "entity:person.sue"
+    assert registry.remaining("occupancy", "person.bob") == 1
+
+
+def test_rate_limit_sources_must_be_known() -> None:
+    assert RATE_LIMIT_SCHEMA({"sources": {"calendar": {"max_calls": 2}}})["sources"]["calendar"]["max_calls"] == 2
+    with pytest.raises(vol.Invalid):
+        RATE_LIMIT_SCHEMA({"sources": {"calender": {"max_calls": 2}}})
@@ -1,12 +1,19 @@
+import asyncio
+import datetime as dt
 from typing import TYPE_CHECKING, Any
-from unittest.mock import Mock
+from unittest.mock import Mock, patch
 
+import homeassistant.util.dt as dt_util
+import pytest
+from homeassistant.components.alarm_control_panel.const import AlarmControlPanelState
 from homeassistant.core import HomeAssistant, ServiceCall, callback
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
 
+from conftest import NotifyRecorder
 from custom_components.autoarm.autoarming import AlarmArmer
 from custom_components.autoarm.const import ChangeSource
 from custom_components.autoarm.helpers import AppHealthTracker
-from custom_components.autoarm.notifier import Notifier
+from custom_components.autoarm.notifier import NOTIFY_QUEUE_SIZE, Notifier
 
 if TYPE_CHECKING:
     from homeassistant.helpers.typing import ConfigType
@@ -607,3 +614,194 @@ async def test_notify_skipped_when_action_is_empty_string(hass: HomeAssistant) -
     """Test that notification hits else branch when notify_action is empty string."""
     notifier = Notifier({"backstop": {}}, hass, Mock(spec=AppHealthTracker), notify_action="")
     await notifier.notify(ChangeSource.BUTTON, message="Empty action")
+
+
+async def test_notify_coalesced_sources(hass: HomeAssistant) -> None:
+    """Test that a coalesced reset names all merged sources, and matches profiles for any of them."""
+    notify_config: ConfigType = {"sun": {"source": [ChangeSource.SUNSET]}}
+    armer = AlarmArmer(
+        hass, TEST_PANEL, notify_enabled=True, notify_action="notify.test_service", notify_profiles=notify_config
+    )
+    calls: list[dict[str, Any]] = []
+
+    @callback
+    def mock_handler(call: ServiceCall) -> None:
+        calls.append({"service": call.service, "data": dict(call.data)})
+
+    hass.services.async_register("notify", "test_service", mock_handler)
+    assert armer.notifier is not None
+    await armer.notifier.notify(
+        ChangeSource.OCCUPANCY,
+        from_state=AlarmControlPanelState.ARMED_AWAY,
+        to_state=AlarmControlPanelState.ARMED_NIGHT,
+        coalesced_sources=[ChangeSource.OCCUPANCY, ChangeSource.SUNSET],
+    )
+
+    assert len(calls) == 1
+    assert calls[0]["data"]["message"] == "Alarm state changed from armed_away to armed_night by Occupancy, Sunset"
+
+
+async def test_dispatcher_times_out_stuck_notification(hass: HomeAssistant) -> None:
+    """Test that a stuck notification is abandoned and counted, without blocking later notifications."""
+    armer = AlarmArmer(hass, TEST_PANEL, notify_enabled=True, notify_action="notify.test_service", notify_profiles={"all": {}})
+    notifier = armer.notifier
+    assert notifier is not None
+    notifier.timeout = 0.05
+    sent: list[str | None] = []
+
+    async def stalling_notify(source: ChangeSource, message: str | None = None, **_kwargs: Any) -> None:
+        if message == "stuck":
+            await asyncio.Event().wait()
+        sent.append(message)
+
+    with patch.object(notifier, "notify", side_effect=stalling_notify):
+        notifier.enqueue(ChangeSource.BUTTON, message="stuck")
+        notifier.enqueue(ChangeSource.BUTTON, message="next")
+        await hass.async_block_till_done()
+
+    assert sent == ["next"]
+    assert armer.app_health_tracker.notifications == {"timeout": 1}
+    assert armer.app_health_tracker.failures == 1
+
+
+async def test_notify_handler_failure_recorded(hass: HomeAssistant, notify_recorder: NotifyRecorder) -> None:
+    """Test that an error raised by the notify action itself is counted as a failed notification."""
+    armer = AlarmArmer(hass, TEST_PANEL, notify_enabled=True, notify_action="notify.test_service", notify_profiles={"all": {}})
+    assert armer.notifier is not None
+    notify_recorder.register("test_service")
+    notify_recorder.failing = {"test_service"}
+    await armer.notifier.notify(ChangeSource.BUTTON, message="Test message")
+
+    assert notify_recorder.calls == []
+    assert armer.app_health_tracker.notifications == {"failed": 1}
+    assert armer.app_health_tracker.failures == 1
+
+
+async def test_dispatcher_times_out_slow_notify_handler(hass: HomeAssistant, notify_recorder: NotifyRecorder) -> None:
+    """Test that a notify action slower than the dispatcher timeout is abandoned and counted, rather than sent."""
+    armer = AlarmArmer(hass, TEST_PANEL, notify_enabled=True, notify_action="notify.test_service", notify_profiles={"all": {}})
+    notifier = armer.notifier
+    assert notifier is not None
+    notifier.timeout = 0.05
+    notify_recorder.register("test_service")
+    notify_recorder.stalling = {"test_service"}
+    notifier.enqueue(ChangeSource.BUTTON, message="Test message")
+    await hass.async_block_till_done()
+
+    assert notify_recorder.calls == []
+    assert armer.app_health_tracker.notifications == {"timeout": 1}
+    assert armer.app_health_tracker.failures == 1
+
+
+async def test_enqueue_drops_when_queue_full(hass: HomeAssistant) -> None:
+    """Test that notifications beyond the queue bound are dropped and counted."""
+    armer = AlarmArmer(hass, TEST_PANEL, notify_enabled=True, notify_action="notify.test_service", notify_profiles={"all": {}})
+    assert armer.notifier is not None
+    for _ in range(NOTIFY_QUEUE_SIZE + 1):
+        armer.notifier.enqueue(ChangeSource.BUTTON, message="Test message")
+    assert armer.app_health_tracker.notifications == {"dropped": 1}
+    armer.notifier.shutdown()
+    assert armer.notifier.queue.empty()
+
+
+async def test_notify_routes_compiled_at_construction(hass: HomeAssistant, notify_recorder: NotifyRecorder) -> None:
+    """Test that every source and state change is routed up front, without sharing mutable payloads."""
+    notify_config: ConfigType = {
+        "common": {"data": {"source": None, "profile": None}},
+        "night": {"state": ["armed_night"]},
+        "backstop": {},
+    }
+    notifier = Notifier(notify_config, hass, AppHealthTracker(hass), "notify.test_service")
+    assert len(notifier.routes) == len(ChangeSource) * (len(AlarmControlPanelState) + 1) ** 2
+
+    night = notifier.route(ChangeSource.SUNSET, AlarmControlPanelState.DISARMED, AlarmControlPanelState.ARMED_NIGHT)
+    assert night is not None
+    assert night.profile_name == "night"
+    assert night.data == {"source": None, "profile": "night"}
+    backstop = notifier.route(ChangeSource.BUTTON, None, None)
+    assert backstop is not None
+    assert backstop.profile_name == "backstop"
+
+    notify_recorder.register("test_service")
+    await notifier.notify(ChangeSource.SUNSET, AlarmControlPanelState.DISARMED, AlarmControlPanelState.ARMED_NIGHT)
+    await hass.async_block_till_done()
+    assert notify_recorder.data[0]["data"] == {"source": "sunset", "profile": "night"}
+    assert night.data["source"] is None
+
+
+async def test_notify_digest_combines_state_changes(hass: HomeAssistant, notify_recorder: NotifyRecorder) -> None:
+    """Test that changes within the digest window are sent as one message with the whole chain and all sources."""
+    notify_config: ConfigType = {"digest": {"digest": dt.timedelta(seconds=10)}}
+    notifier = Notifier(notify_config, hass, AppHealthTracker(hass), "notify.test_service")
+    notify_recorder.register("test_service")
+    await notifier.notify(ChangeSource.OCCUPANCY, AlarmControlPanelState.ARMED_AWAY, AlarmControlPanelState.DISARMED)
+    await notifier.notify(ChangeSource.SUNSET, AlarmControlPanelState.DISARMED, AlarmControlPanelState.ARMED_NIGHT)
+    await notifier.notify(ChangeSource.OCCUPANCY, AlarmControlPanelState.ARMED_NIGHT, AlarmControlPanelState.ARMED_HOME)
+    await hass.async_block_till_done()
+    assert notify_recorder.data == []
+
+    async_fire_time_changed(hass, dt_util.utcnow() + dt.timedelta(seconds=11))
+    await hass.async_block_till_done()
+    assert len(notify_recorder.data) == 1
+    assert notify_recorder.data[0]["title"] == "Alarm now armed_home"
+    assert (
+        notify_recorder.data[0]["message"]
+        == "Alarm state changed armed_away → disarmed → armed_night → armed_home by Occupancy, Sunset"
+    )
+    assert notifier.app_health_tracker.notifications == {"digested": 3, "sent": 1}
+    assert notifier.app_health_tracker.failures == 0
+
+
+async def test_notify_digest_bypassed_for_alarm_panel(hass: HomeAssistant, notify_recorder: NotifyRecorder) -> None:
+    """Test that alarm panel changes are sent at once, after any digest already buffered for the profile."""
+    notify_config: ConfigType = {"digest": {"digest": dt.timedelta(seconds=10)}}
+    notifier = Notifier(notify_config, hass, AppHealthTracker(hass), "notify.test_service")
+    notify_recorder.register("test_service")
+    await notifier.notify(ChangeSource.SUNSET, AlarmControlPanelState.DISARMED, AlarmControlPanelState.ARMED_NIGHT)
+    await notifier.notify(ChangeSource.ALARM_PANEL, AlarmControlPanelState.ARMED_NIGHT, AlarmControlPanelState.TRIGGERED)
+    await hass.async_block_till_done()
+    assert [call["message"] for call in notify_recorder.data] == [
+        "Alarm state changed from disarmed to armed_night by Sunset",
+        "Alarm state changed from armed_night to triggered by Alarm_panel",
+    ]
+    assert notifier.digests == {}
+
+    async_fire_time_changed(hass, dt_util.utcnow() + dt.timedelta(seconds=11))
+    await hass.async_block_till_done()
+    assert len(notify_recorder.data) == 2
+
+
+@pytest.mark.parametrize(
+    ("stalling", "failing", "outcome", "target_outcomes"),
+    [
+        (set(), set(), "sent", {"slow": "sent", "fast": "sent", "notify.phone": "sent"}),
+        ({"slow"}, set(), "partial", {"slow": "timeout", "fast": "sent", "notify.phone": "sent"}),
+        ({"slow"}, {"fast", "phone"}, "failed", {"slow": "timeout", "fast": "failed", "notify.phone": "failed"}),
+    ],
+    ids=["sent", "partial", "failed"],
+)
+async def test_notify_fanout_isolates_slow_target(
+    hass: HomeAssistant,
+    notify_recorder: NotifyRecorder,
+    stalling: set[str],
+    failing: set[str],
+    outcome: str,
+    target_outcomes: dict[str, str],
+) -> None:
+    """Test that fan-out calls each target separately, timing out a slow target without holding up the rest."""
+    notify_config: ConfigType = {"fanout": {"fanout": True, "target": ["slow", "fast", "notify.phone"]}}
+    notifier = Notifier(notify_config, hass, AppHealthTracker(hass), "notify.test_service")
+    notifier.target_timeout = 0.05
+    notify_recorder.register("test_service", "phone")
+    notify_recorder.stalling = stalling
+    notify_recorder.failing = failing
+    await notifier.notify(ChangeSource.BUTTON, message="Test message")
+    await hass.async_block_till_done()
+
+    assert len(notify_recorder.calls) == list(target_outcomes.values()).count("sent")
+    tracker = notifier.app_health_tracker
+    assert tracker.notifications == {outcome: 1}
+    assert tracker.failures == (0 if outcome == "sent" else 1)
+    for target, target_outcome in target_outcomes.items():
+        assert tracker.notification_targets[target][target_outcome] == 1
+    assert tracker.notification_targets["fast"]["last_latency"] < notifier.target_timeout
@@ -0,0 +1,166 @@
+import datetime as dt
+import itertools
+
+import homeassistant.util.dt as dt_util
+import pytest
+from homeassistant.components.alarm_control_panel.const import AlarmControlPanelState
+from homeassistant.components.calendar import CalendarEvent
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import config_validation as cv
+
+from conftest import TEST_PANEL
+from custom_components.autoarm.autoarming import AlarmArmer
+from custom_components.autoarm.const import CONF_DAY, CONF_NIGHT, DEFAULT_TRANSITIONS, ConditionVariables
+from custom_components.autoarm.hass_api import HomeAssistantAPI
+from custom_components.autoarm.transitions import (
+    ConditionCheckerType,
+    NativeCondition,
+    TransitionTable,
+    compile_conditions,
+    native_condition,
+)
+
+CALENDAR_EVENT = CalendarEvent(
+    start=dt_util.now(), end=dt_util.now() + dt.timedelta(hours=1), summary="Away", description="armed_away"
+)
+
+
+def input_space() -> list[ConditionVariables]:
+    return [
+        ConditionVariables(
+            occupied=occupied,
+            unoccupied=None if occupied is None else not occupied,
+            night=night,
+            state=state,
+            occupied_defaults={CONF_DAY: day_default, CONF_NIGHT: night_default},
+            calendar_event=calendar_event,
+        )
+        for occupied, night, state, calendar_event, day_default, night_default in itertools.product(
+            (True, False, None),
+            (True, False),
+            list(AlarmControlPanelState),
+            (None, CALENDAR_EVENT),
+            (AlarmControlPanelState.DISARMED, AlarmControlPanelState.ARMED_HOME, AlarmControlPanelState.ARMED_AWAY),
+            (AlarmControlPanelState.DISARMED, AlarmControlPanelState.ARMED_HOME, AlarmControlPanelState.ARMED_NIGHT),
+        )
+    ]
+
+
+@pytest.mark.parametrize("state", DEFAULT_TRANSITIONS.keys())
+async def test_default_transitions_native_matches_template(hass_api: HomeAssistantAPI, state: str) -> None:
+    condition = cv.CONDITIONS_SCHEMA(DEFAULT_TRANSITIONS[state])
+    template_checker = await hass_api.build_condition(condition, name=state)
+    assert template_checker is not None
+    checker = native_condition(condition, template_checker, name=state)
+    assert isinstance(checker, NativeCondition)
+
+    outcomes: set[bool] = set()
+    for cvars in input_space():
+        outcome: bool = template_checker(cvars.template_context)
+        assert checker(cvars.template_context) == outcome, cvars
+        outcomes.add(outcome)
+    assert outcomes == {True, False}
+
+
+@pytest.mark.parametrize(
+    "template",
+    [
+        "{{ autoarm.occupied }}",
+        "{{ not autoarm.occupied }}",
+        "{{ autoarm.occupied or autoarm.night }}",
+        "{{ autoarm.occupied and autoarm.state }}",
+        "{{ autoarm.state == 'disarmed' or autoarm.state != 'armed_home' }}",
+        "{{ autoarm.occupied is not none and autoarm.calendar_event is none }}",
+        "{{ 'true' }}",
+    ],
+)
+async def test_native_shapes_match_template(hass_api: HomeAssistantAPI, template: str) -> None:
+    condition = cv.CONDITIONS_SCHEMA({"condition": "template", "value_template": template})
+    template_checker = await hass_api.build_condition(condition)
+    assert template_checker is not None
+    checker = native_condition(condition, template_checker)
+    assert isinstance(checker, NativeCondition)
+
+    for cvars in input_space():
+        assert checker(cvars.template_context) == template_checker(cvars.template_context), cvars
+
+
+@pytest.mark.parametrize(
+    "condition",
+    [
+        {"condition": "template", "value_template": "{{ is_state('person.bob', 'home') }}"},
+        {"condition": "template", "value_template": "{{ autoarm.occupied }} and {{ autoarm.night }}"},
+        {"condition": "template", "value_template": "{{ autoarm.unknown_field }}"},
+        {"condition": "template", "value_template": "{{ autoarm.at_home | length > 0 }}"},
+        {"condition": "state", "entity_id": "person.bob", "state": "home"},
+    ],
+)
+def test_unrecognised_conditions_fall_back(condition: dict[str, str]) -> None:
+    assert compile_conditions(cv.CONDITIONS_SCHEMA(condition)) is None
+
+
+async def test_native_condition_without_variables_uses_template(hass_api: HomeAssistantAPI) -> None:
+    condition = cv.CONDITIONS_SCHEMA({"condition": "template", "value_template": "{{ autoarm is not defined }}"})
+    template_checker = await hass_api.build_condition(condition)
+    assert template_checker is not None
+    checker = NativeCondition(lambda _fields: False, template_checker)
+    assert checker(None) is True
+
+
+async def test_default_transitions_use_native_conditions(autoarmer: AlarmArmer) -> None:
+    assert len(autoarmer.transitions) == len(DEFAULT_TRANSITIONS)
+    assert all(isinstance(checker, NativeCondition) for checker in autoarmer.transitions.values())
+    assert autoarmer.transition_table is not None
+
+
+async def test_transition_table_matches_template_evaluation(hass_api: HomeAssistantAPI) -> None:
+    template_checkers: dict[AlarmControlPanelState, ConditionCheckerType] = {}
+    native_checkers: dict[AlarmControlPanelState, ConditionCheckerType] = {}
+    for state, raw_condition in DEFAULT_TRANSITIONS.items():
+        condition = cv.CONDITIONS_SCHEMA(raw_condition)
+        template_checker = await hass_api.build_condition(condition, name=state)
+        assert template_checker is not None
+        template_checkers[AlarmControlPanelState(state)] = template_checker
+        native_checkers[AlarmControlPanelState(state)] = native_condition(condition, template_checker)
+    table = TransitionTable.build(native_checkers, {})
+    assert table is not None
+    assert len(table.outcomes) == 3 * 2 * len(AlarmControlPanelState) * 2
+
+    for cvars in input_space():
+        expected = next(
+            (state for state, checker in template_checkers.items() if checker(cvars.template_context)),
+            None,
+        )
+        assert table.lookup(cvars) == expected, cvars
+
+
+@pytest.mark.parametrize(
+    "template",
+    ["{{ is_state('person.bob', 'home') }}", "{{ autoarm.occupied and autoarm.at_home == 'person.bob' }}"],
+)
+async def test_transition_table_excludes_external_conditions(hass_api: HomeAssistantAPI, template: str) -> None:
+    condition = cv.CONDITIONS_SCHEMA({"condition": "template", "value_template": template})
+    template_checker = await hass_api.build_condition(condition)
+    assert template_checker is not None
+    vacation = cv.CONDITIONS_SCHEMA(DEFAULT_TRANSITIONS["armed_vacation"])
+    vacation_checker = await hass_api.build_condition(vacation)
+    assert vacation_checker is not None
+    transitions: dict[AlarmControlPanelState, ConditionCheckerType] = {
+        AlarmControlPanelState.ARMED_VACATION: native_condition(vacation, vacation_checker),
+        AlarmControlPanelState.ARMED_HOME: native_condition(condition, template_checker),
+    }
+    assert TransitionTable.build(transitions, {}) is None
+
+
+async def test_armer_rebuilds_transition_table(hass: HomeAssistant) -> None:
+    autoarmer = AlarmArmer(
+        hass,
+        TEST_PANEL,
+        transitions={"armed_home": {"conditions": cv.CONDITIONS_SCHEMA("{{ is_state('sun.sun', 'above_horizon') }}")}},
+    )
+    await autoarmer.initialize()
+    assert autoarmer.transition_table is None
+    autoarmer.transition_config = {}
+    await autoarmer.initialize_logic()
+    assert autoarmer.transition_table is not None
+    autoarmer.shutdown()